@@ -0,0 +1,36 @@
+"""Add user change feed index and tombstones
+
+Revision ID: 3f9c2a7d1b54
+Revises: 864db8bd0e04
+Create Date: 2026-10-19 09:12:04.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1b54'
+down_revision: Union[str, Sequence[str], None] = '864db8bd0e04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_users_updated_at_id', 'users', ['updated_at', 'id'], unique=False)
+    op.create_table('user_tombstones',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_user_tombstones_deleted_at_user_id', 'user_tombstones', ['deleted_at', 'user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_tombstones_deleted_at_user_id', table_name='user_tombstones')
+    op.drop_table('user_tombstones')
+    op.drop_index('ix_users_updated_at_id', table_name='users')
@@ -0,0 +1,44 @@
+"""Add user search indexes (prefix and trigram)
+
+Revision ID: a71e4c2f9d30
+Revises: 3f9c2a7d1b54
+Create Date: 2026-10-19 11:02:37.140866
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71e4c2f9d30'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d1b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Search is case-insensitive, so every index is on lower(column):
+# - text_pattern_ops btree serves `lower(col) LIKE 'q%'` whatever the database collation
+# - pg_trgm GIN serves `lower(col) LIKE '%q%'` for queries of 3+ characters
+INDEXES = {
+    "ix_users_email_lower_pattern": "USING btree (lower(email) text_pattern_ops)",
+    "ix_users_username_lower_pattern": "USING btree (lower(username) text_pattern_ops)",
+    "ix_users_email_lower_trgm": "USING gin (lower(email) gin_trgm_ops)",
+    "ix_users_username_lower_trgm": "USING gin (lower(username) gin_trgm_ops)",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON users {definition}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for name in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,35 @@
+"""Add code-point ordered index for item name prefix search
+
+Revision ID: c5e81d3a6f27
+Revises: a71e4c2f9d30
+Create Date: 2026-10-19 15:24:08.512903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e81d3a6f27'
+down_revision: Union[str, Sequence[str], None] = 'a71e4c2f9d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Serves `name COLLATE "C"` ranges and (name, id) keyset order in CRUDItem.by_name_prefix,
+# whatever the database collation
+INDEX_NAME = "ix_new_items_name_c"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON new_items (name COLLATE "C", id)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
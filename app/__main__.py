@@ -0,0 +1,66 @@
+import argparse
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_cmd = commands.add_parser("serve", help="run the production server")
+    serve_cmd.add_argument("--host", help="bind address (default: SERVER_HOST)")
+    serve_cmd.add_argument("--port", type=int, help="bind port (default: SERVER_PORT)")
+    serve_cmd.add_argument("--workers", type=int, help="worker processes (default: SERVER_WORKERS, 0 = auto)")
+    serve_cmd.add_argument("--print-config", action="store_true", help="print the resolved config and exit")
+
+    calibrate_cmd = commands.add_parser("calibrate-hash", help="pick password-hash costs for this host")
+    calibrate_cmd.add_argument("--target-ms", type=float, default=250.0, help="verify time per login (default: 250)")
+    calibrate_cmd.add_argument("--scheme", choices=["bcrypt", "argon2"], help="default: PASSWORD_HASH_SCHEME")
+    calibrate_cmd.add_argument("--memory-kib", type=int, help="argon2 memory cost (default: ARGON2_MEMORY_COST_KIB)")
+    calibrate_cmd.add_argument("--parallelism", type=int, help="argon2 lanes (default: ARGON2_PARALLELISM)")
+    calibrate_cmd.add_argument("--write-env", metavar="PATH", help="store the chosen settings in this env file")
+    calibrate_cmd.add_argument("--json", action="store_true", help="print the result as JSON")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        from app import server
+
+        if args.print_config:
+            print(json.dumps(server.server_config(args.workers, args.host, args.port), indent=2))
+            return
+        server.serve(args.workers, args.host, args.port)
+
+    elif args.command == "calibrate-hash":
+        from app.core.config import settings
+        from app.utils import hash_calibration
+
+        scheme = args.scheme or settings.PASSWORD_HASH_SCHEME
+        if scheme == "argon2":
+            if importlib.util.find_spec("argon2") is None:
+                sys.exit("argon2 needs the argon2-cffi package: pip install argon2-cffi")
+            result = hash_calibration.calibrate_argon2(
+                args.target_ms,
+                memory_kib=args.memory_kib or settings.ARGON2_MEMORY_COST_KIB,
+                parallelism=args.parallelism or settings.ARGON2_PARALLELISM,
+            )
+        else:
+            result = hash_calibration.calibrate_bcrypt(args.target_ms)
+        result["current"] = {key: getattr(settings, key) for key in result["settings"]}
+
+        if args.write_env:
+            hash_calibration.update_env_file(Path(args.write_env), result["settings"])
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print(f"{scheme}: verify takes {result['verify_ms']} ms (target {args.target_ms:g} ms)")
+            for key, value in result["settings"].items():
+                print(f"  {key}={value}  (current: {result['current'][key]})")
+            if args.write_env:
+                print(f"written to {args.write_env}; existing hashes are upgraded as users log in")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from . import users, tasks, auth
+from . import users, tasks, auth, items
 
 api_router = APIRouter(prefix="/api/v1")
 
 api_router.include_router(users.router,prefix="/users")
 api_router.include_router(tasks.router,prefix="/tasks")
 api_router.include_router(auth.router,prefix="/auth")
+api_router.include_router(items.router,prefix="/items")
@@ -1,6 +1,8 @@
+import time
 from datetime import timedelta
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
@@ -8,9 +10,12 @@ from pydantic import BaseModel, EmailStr
 from app.db.session import get_session
 from app.schemas.user import UserOut, UserUpdate, UserChangePassword
 from app.crud import user as user_crud
-from app.services.security import verify_password
+from app.services.security import hash_password, needs_rehash, verify_password
 from app.core.config import settings
-from app.services import jwt_service
+from app.core.logger import logger
+from app.services import jwt_service, redis_client
+from app.services.rate_limit import get_rate_limiter, rate_limit
+from app.services.token_revocation import get_revocations
 
 router = APIRouter(tags=["authentication"])
 security = HTTPBearer()
@@ -27,6 +32,7 @@ class LoginRequest(BaseModel):
 class TokenResponse(BaseModel):
     """Token response model"""
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
     expires_in: int
     user: UserOut
@@ -56,6 +62,19 @@ async def get_current_user(
             detail="Invalid token type"
         )
 
+    # Session revoked (logout or refresh-token reuse); the filter answers misses without I/O.
+    # A filter hit the store can't confirm fails closed: hits are almost always real revocations.
+    family = payload.get("fam")
+    try:
+        revoked = bool(family) and await get_revocations().is_revoked(family)
+    except redis_client.RedisError as e:
+        raise token_service_unavailable(e)
+    if revoked:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+
     # User ID extract
     user_id = payload.get("sub")
     if not user_id:
@@ -84,15 +103,79 @@ async def get_current_active_user(
     return current_user
 
 
+def issue_tokens(user_obj, family: str) -> TokenResponse:
+    """Access and refresh token pair for one login session (`family`)"""
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = jwt_service.create_access_token(
+        data={"sub": str(user_obj.id), "fam": family},
+        expires_delta=access_token_expires
+    )
+    return TokenResponse(
+        access_token=access_token,
+        refresh_token=jwt_service.create_refresh_token(user_obj.id, family=family),
+        token_type="bearer",
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,  # seconds
+        user=UserOut.model_validate(user_obj)
+    )
+
+
+def refresh_claims(token: str) -> dict:
+    """Payload of a valid refresh token issued with a jti and session family"""
+    payload = jwt_service.verify_token(token)
+
+    # Token type check
+    if payload.get("type") != "refresh":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type"
+        )
+    if not (payload.get("sub") and payload.get("jti") and payload.get("fam")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token payload"
+        )
+    return payload
+
+
+async def upgrade_password_hash(bind, user_id: int, old_hash: str, password: str) -> None:
+    """Background rehash after login; runs after the response, in its own session"""
+    try:
+        new_hash = await run_in_threadpool(hash_password, password)
+        async with AsyncSession(bind, expire_on_commit=False) as db:
+            if await user_crud.user.replace_password_hash(db, user_id=user_id, old_hash=old_hash, new_hash=new_hash):
+                logger.bind(user_id=user_id).info("Password hash upgraded")
+    except Exception as e:
+        # Harmless to skip: the next login tries again
+        logger.bind(user_id=user_id).warning("Password hash upgrade failed: {}", e)
+
+
+def token_service_unavailable(e: Exception) -> HTTPException:
+    """503 for revocation store errors: fail closed, revoked sessions can't be told apart without it"""
+    logger.warning("Token revocation store unavailable: {}", e)
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Token service unavailable"
+    )
+
+
+def session_expiry() -> float:
+    """A family outlives every refresh token that can still be issued in it"""
+    return time.time() + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+
+
 # AUTH ENDPOINTS
 
-@router.post("/login", response_model=TokenResponse)
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(rate_limit("login"))])
 async def login(
         login_data: LoginRequest,
+        background_tasks: BackgroundTasks,
         db: AsyncSession = Depends(get_session)
 ):
     """User login - returns JWT token"""
 
+    # Per-account limit (per-IP one runs as a dependency); both run before bcrypt
+    await get_rate_limiter().hit("login:account", login_data.email.lower())
+
     # Find user with email
     user_obj = await user_crud.user.get_by_email(db, email=login_data.email)
     if not user_obj:
@@ -108,19 +191,13 @@ async def login(
             detail="Invalid email or password"
         )
 
-    # Create token
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = jwt_service.create_access_token(
-        data={"sub": str(user_obj.id)},
-        expires_delta=access_token_expires
-    )
+    # Scheme or cost changed since this hash was made: upgrade it once the response is out
+    if needs_rehash(user_obj.hashed_password):
+        background_tasks.add_task(
+            upgrade_password_hash, db.bind, user_obj.id, user_obj.hashed_password, login_data.password
+        )
 
-    return TokenResponse(
-        access_token=access_token,
-        token_type="bearer",
-        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,  # seconds
-        user=UserOut.model_validate(user_obj)
-    )
+    return issue_tokens(user_obj, family=jwt_service.new_token_id())
 
 
 @router.post("/refresh", response_model=TokenResponse)
@@ -128,39 +205,55 @@ async def refresh_access_token(
         refresh_data: RefreshTokenRequest,
         db: AsyncSession = Depends(get_session)
 ):
-    """Get the new access token with a refresh token"""
-
-    payload = jwt_service.verify_token(refresh_data.refresh_token)
-
-    # Token type check
-    if payload.get("type") != "refresh":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token type"
-        )
+    """
+    Exchange a refresh token for a new access/refresh pair. The presented
+    token is single use: presenting it again means it leaked, so the whole
+    session is revoked.
+    """
+
+    payload = refresh_claims(refresh_data.refresh_token)
+    revocations = get_revocations()
+
+    try:
+        if await revocations.is_revoked(payload["fam"]):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+
+        # Atomic claim: of two requests racing with the same token only one wins
+        if not await revocations.claim(payload["jti"], payload["exp"]):
+            await revocations.revoke(payload["fam"], session_expiry())
+            logger.bind(user_id=payload["sub"]).warning("Refresh token reuse detected; session revoked")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+    except redis_client.RedisError as e:
+        raise token_service_unavailable(e)
 
     # User fetch
-    user_id = int(payload.get("sub"))
-    user_obj = await user_crud.user.get_by_id(db, user_id)
+    user_obj = await user_crud.user.get_by_id(db, int(payload["sub"]))
     if not user_obj:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
 
-    # New access token
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = jwt_service.create_access_token(
-        data={"sub": str(user_obj.id)},
-        expires_delta=access_token_expires
-    )
+    return issue_tokens(user_obj, family=payload["fam"])
 
-    return TokenResponse(
-        access_token=access_token,
-        token_type="bearer",
-        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        user=UserOut.model_validate(user_obj)
-    )
+
+@router.post("/logout")
+async def logout(refresh_data: RefreshTokenRequest):
+    """Revoke the session of a refresh token, including its access tokens"""
+
+    payload = refresh_claims(refresh_data.refresh_token)
+    try:
+        await get_revocations().revoke(payload["fam"], session_expiry())
+    except redis_client.RedisError as e:
+        raise token_service_unavailable(e)
+
+    return {"message": "Logged out successfully"}
 
 
 @router.get("/me", response_model=UserOut)
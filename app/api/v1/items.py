@@ -0,0 +1,91 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import item as item_crud
+from app.db.session import get_session
+from app.schemas.item import IngestResult, ItemCreate, ItemOut, ItemPage
+from app.services import item_ingest
+from app.utils.cursor import InvalidCursor, decode_cursor, encode_cursor
+
+router = APIRouter(tags=["items"])
+
+PARSERS = {
+    "application/x-ndjson": item_ingest.parse_ndjson,
+    "application/jsonl": item_ingest.parse_ndjson,
+    "text/csv": item_ingest.parse_csv,
+}
+
+
+def _after_id(after: Optional[str]) -> Optional[int]:
+    if not after:
+        return None
+    try:
+        return decode_cursor(after, 1)[0]
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def _page(items: list, limit: int) -> ItemPage:
+    next_cursor = encode_cursor(items[limit - 1].id) if len(items) > limit else None
+    return ItemPage(items=items[:limit], next_cursor=next_cursor)
+
+
+@router.get("", response_model=ItemPage)
+async def list_items(
+        after: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=settings.ITEMS_PAGE_MAX),
+        db: AsyncSession = Depends(get_session),
+):
+    """Items ordered by id, keyset-paginated with `after`"""
+    items = await item_crud.item.list_after(db, after_id=_after_id(after), limit=limit + 1)
+    return _page(items, limit)
+
+
+@router.get("/search", response_model=ItemPage)
+async def search_items_by_prefix(
+        prefix: str = Query(..., min_length=1, max_length=200),
+        after: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=settings.ITEMS_PAGE_MAX),
+        db: AsyncSession = Depends(get_session),
+):
+    """Items whose name starts with `prefix`, ordered by name"""
+    items = await item_crud.item.by_name_prefix(db, prefix=prefix, after_id=_after_id(after), limit=limit + 1)
+    return _page(items, limit)
+
+
+@router.post("/ingest", response_model=IngestResult, status_code=status.HTTP_201_CREATED)
+async def ingest_items(request: Request, db: AsyncSession = Depends(get_session)):
+    """
+    Bulk load items from an NDJSON (application/x-ndjson) or CSV (text/csv)
+    body. The body is parsed as it streams in and written with COPY in
+    batches of ITEMS_INGEST_BATCH_SIZE; the load is all-or-nothing.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    parser = PARSERS.get(content_type)
+    if parser is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type must be one of: {', '.join(PARSERS)}",
+        )
+
+    lines = item_ingest.iter_lines(request.stream(), settings.ITEMS_INGEST_MAX_LINE_BYTES)
+    try:
+        return await item_ingest.ingest(db, parser(lines), settings.ITEMS_INGEST_BATCH_SIZE)
+    except item_ingest.IngestError as e:
+        raise HTTPException(status_code=422, detail={"line": e.line, "error": e.message})
+
+
+@router.post("", response_model=ItemOut, status_code=status.HTTP_201_CREATED)
+async def create_item(payload: ItemCreate, db: AsyncSession = Depends(get_session)):
+    return await item_crud.item.create(db, obj_in=payload)
+
+
+@router.get("/{item_id}", response_model=ItemOut)
+async def get_item(item_id: int, db: AsyncSession = Depends(get_session)):
+    item = await item_crud.item.get(db, item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="item not found")
+    return item
@@ -1,17 +1,63 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from app.tasks.email import send_email
+from typing import Any, Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
-router = APIRouter(tags=["tasks"])
+from app.core.config import settings
+from app.services import redis_client, task_events, task_status
+from app.services.idempotency import IdempotentRoute
+
+# POST endpoints accept an Idempotency-Key header (safe client retries)
+router = APIRouter(tags=["tasks"], route_class=IdempotentRoute)
 
 class EmailPayload(BaseModel):
     to: str
     subject: str
     body: str
 
+class TaskStatus(BaseModel):
+    task_id: str
+    status: str
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    date_done: Optional[str] = None
+
+class TaskStatusRequest(BaseModel):
+    task_ids: list[str] = Field(..., min_length=1, max_length=settings.TASK_STATUS_BATCH_MAX)
+
 @router.post("/send-email")
 async def trigger_send_email(payload: EmailPayload):
+    # Celery is imported on first use rather than at app start-up
+    from app.tasks.email import send_email
+
     # .delay() sends task to the broker (non-blocking)
     task = send_email.delay(payload.to, payload.subject, payload.body)
     return {"task_id": task.id}
 
+@router.post("/status", response_model=list[TaskStatus])
+async def get_tasks_status(request: TaskStatusRequest):
+    """Status of many tasks, fetched from the result backend in one round trip"""
+    try:
+        statuses = await task_status.get_task_statuses(request.task_ids)
+    except redis_client.RedisError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Result backend unavailable")
+    return [statuses[task_id] for task_id in request.task_ids]
+
+@router.get("/events")
+async def stream_task_events(
+        task_ids: list[str] = Query(..., alias="task_id", min_length=1, max_length=settings.TASK_STATUS_BATCH_MAX)
+):
+    """Server-Sent Events stream of state transitions for one or more tasks (?task_id=a&task_id=b)"""
+    return StreamingResponse(
+        task_events.stream_task_events(list(dict.fromkeys(task_ids))),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/{task_id}", response_model=TaskStatus)
+async def get_task(task_id: str):
+    """Status of a single task"""
+    try:
+        return await task_status.get_task_status(task_id)
+    except redis_client.RedisError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Result backend unavailable")
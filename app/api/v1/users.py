@@ -1,19 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.db.session import get_session
-from app.schemas.user import UserCreate, UserUpdate, UserOut
+from app.schemas.user import (
+    UserCreate, UserUpdate, UserOut, UserChange, UserChangesPage, UserSearchHit, UserSearchPage,
+)
 from app.crud import user as user_crud
+from app.services.idempotency import IdempotentRoute
+from app.utils.cursor import InvalidCursor, datetime_to_micros, decode_cursor, encode_cursor, micros_to_datetime
 
-router = APIRouter(tags=["users"])
+# POST endpoints accept an Idempotency-Key header (safe client retries)
+router = APIRouter(tags=["users"], route_class=IdempotentRoute)
 
 @router.get("/users", response_model=list[UserOut])
 async def list_users(limit: int = 50, offset: int = 0, db: AsyncSession = Depends(get_session)):
-    users = await user_crud.list_users(db, limit=limit, offset=offset)
+    users = await user_crud.user.list_users(db, limit=limit, offset=offset)
     return users
 
+@router.get("/users/changes", response_model=UserChangesPage, response_model_exclude_none=True)
+async def list_user_changes(
+        since: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=settings.USER_CHANGES_LIMIT_MAX),
+        db: AsyncSession = Depends(get_session),
+):
+    """
+    Users created, updated or deleted after the `since` cursor, oldest first.
+    Start without `since` for a full sync, then keep passing back `next_cursor`.
+    Changes younger than USER_CHANGES_SETTLE_SECONDS are held back so rows from
+    still-open transactions cannot slip in behind a cursor already handed out.
+    """
+    after = None
+    if since:
+        try:
+            micros, user_id = decode_cursor(since, 2)
+            after = (micros_to_datetime(micros), user_id)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="invalid cursor")
+
+    until = datetime.now(timezone.utc) - timedelta(seconds=settings.USER_CHANGES_SETTLE_SECONDS)
+    rows = await user_crud.user.changes_since(db, after=after, until=until, limit=limit + 1)
+    page = rows[:limit]
+    changes = [
+        UserChange(op="upsert", id=user_id, user=u) if u is not None else UserChange(op="delete", id=user_id)
+        for _, user_id, u in page
+    ]
+    next_cursor = encode_cursor(datetime_to_micros(page[-1][0]), page[-1][1]) if page else (since or encode_cursor(0, 0))
+    return UserChangesPage(changes=changes, next_cursor=next_cursor, has_more=len(rows) > limit)
+
+MATCH_LABELS = ("exact", "prefix", "substring")
+
+@router.get("/users/search", response_model=UserSearchPage)
+async def search_users(
+        q: str = Query(..., min_length=1, max_length=254),
+        after: Optional[str] = None,
+        limit: int = Query(20, ge=1, le=settings.USER_SEARCH_LIMIT_MAX),
+        db: AsyncSession = Depends(get_session),
+):
+    """Users whose email or username contains `q`, best matches first"""
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=422, detail="q must not be blank")
+    cursor = None
+    if after:
+        try:
+            cursor = decode_cursor(after, 2)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="invalid cursor")
+
+    rows = await user_crud.user.search(
+        db, q=q, after=cursor, limit=limit + 1, min_substring=settings.USER_SEARCH_MIN_SUBSTRING
+    )
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1][0], page[-1][1].id) if len(rows) > limit else None
+    return UserSearchPage(
+        items=[UserSearchHit(match=MATCH_LABELS[rank], user=u) for rank, u in page],
+        next_cursor=next_cursor,
+    )
+
 @router.get("/users/{user_id}", response_model=UserOut)
 async def get_user(user_id: int, db: AsyncSession = Depends(get_session)):
-    u = await user_crud.get_by_id(db, user_id)
+    u = await user_crud.user.get_by_id(db, user_id)
     if not u:
         raise HTTPException(status_code=404, detail="user not found")
     return u
@@ -29,27 +98,26 @@ async def create_user(payload: UserCreate, db: AsyncSession = Depends(get_sessio
     """
 
     # 1. Check if email already exists
-    existing_user = await user_crud.get_by_email(db, str(payload.email))
+    existing_user = await user_crud.user.get_by_email(db, email=str(payload.email))
     if existing_user:
         raise HTTPException(status_code=409, detail="Email already registered")
 
     # 2. Create user (CRUD handles hashing and type conversion)
-    new_user = await user_crud.create(db, payload)
+    new_user = await user_crud.user.create(db, obj_in=payload)
 
     # 3. Return user output
     return new_user
 @router.patch("/users/{user_id}", response_model=UserOut)
 async def update_user(user_id: int, payload: UserUpdate, db: AsyncSession = Depends(get_session)):
-    u = await user_crud.get_by_id(db, user_id)
+    u = await user_crud.user.get_by_id(db, user_id)
     if not u:
         raise HTTPException(status_code=404, detail="user not found")
-    u = await user_crud.patch(db, u, payload)
+    u = await user_crud.user.update(db, db_obj=u, obj_in=payload)
     return u
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(user_id: int, db: AsyncSession = Depends(get_session)):
-    u = await user_crud.get_by_id(db, user_id)
+    u = await user_crud.user.remove(db, id=user_id)
     if not u:
         raise HTTPException(status_code=404, detail="user not found")
-    await user_crud.remove(db, u)
     return None
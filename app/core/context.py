@@ -0,0 +1,36 @@
+"""
+Per-request context shared by the API, logging and Celery.
+Kept free of heavy imports so the worker can use it too.
+"""
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+REQUEST_ID_HEADER = "X-Request-ID"
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+# time.monotonic() by which the current request must be answered
+deadline_var: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+# Incoming ids are echoed into logs and headers, so only accept short, plain tokens
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    """Reuse a well-formed id from the caller, otherwise generate one"""
+    if incoming and _VALID_REQUEST_ID.match(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def get_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+
+def time_left() -> Optional[float]:
+    """Seconds until the current request's deadline; None when there is none"""
+    deadline = deadline_var.get()
+    return None if deadline is None else deadline - time.monotonic()
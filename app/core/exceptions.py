@@ -1,3 +1,4 @@
+import math
 from fastapi import HTTPException, status
 from typing import Any
 
@@ -6,8 +7,8 @@ class AppException(HTTPException):
     Base application exception that wraps HTTPException for consistency.
     Use subclasses for domain-specific errors.
     """
-    def __init__(self, status_code: int, detail: Any):
-        super().__init__(status_code=status_code, detail=detail)
+    def __init__(self, status_code: int, detail: Any, headers: dict[str, str] | None = None):
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
 
 
 class BadRequestException(AppException):
@@ -35,6 +36,15 @@ class ConflictException(AppException):
         super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
 
 
+class TooManyRequestsException(AppException):
+    def __init__(self, retry_after: float, detail: str = "Too many requests"):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
 class InternalServerError(AppException):
     def __init__(self, detail: str = "Internal server error"):
         super().__init__(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
@@ -1,16 +1,183 @@
+import atexit
+import json
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import timezone
 from pathlib import Path
+from typing import Any, TextIO
+
 from loguru import logger
 from app.core.config import settings
+from app.core.context import request_id_var
+
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan> [{extra[request_id]}] - <level>{message}</level>"
+)
+
+
+class BufferedSink:
+    """
+    Loguru sink that hands records to a writer thread through a bounded queue.
+    Logging never blocks the caller: when the queue is full the record is
+    dropped and counted instead. JSON serialization also happens on the
+    writer thread.
+
+    The thread is started lazily and restarted after a fork, so gunicorn
+    workers forked from a preloaded master each get their own.
+    """
+
+    def __init__(self, stream: TextIO, max_size: int, serialize: bool, batch_size: int = 256):
+        self.stream = stream
+        self.max_size = max_size
+        self.serialize = serialize
+        self.batch_size = batch_size
+        self.written = 0
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._thread: threading.Thread | None = None
+        self._pid = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, message) -> None:
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait(message.record if self.serialize else str(message))
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_size)
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write(batch)
+                    return
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: list) -> None:
+        lines = [format_json(item) + "\n" if self.serialize else item for item in batch]
+        if self.dropped != self._reported_dropped:
+            lost, self._reported_dropped = self.dropped - self._reported_dropped, self.dropped
+            lines.append(self._drop_notice(lost))
+        try:
+            self.stream.write("".join(lines))
+            self.stream.flush()
+        except Exception:
+            return
+        self.written += len(batch)
+
+    def _drop_notice(self, lost: int) -> str:
+        text = f"log buffer full, dropped {lost} records"
+        if self.serialize:
+            return json.dumps({"level": "WARNING", "logger": __name__, "message": text, "dropped": lost}) + "\n"
+        return f"WARNING: {text}\n"
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Drain queued records; called at exit"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": log_sampler.sampled_out,
+        }
+
+
+def format_json(record: dict[str, Any]) -> str:
+    entry: dict[str, Any] = {
+        "ts": record["time"].astimezone(timezone.utc).isoformat(timespec="milliseconds"),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    entry.update(record["extra"])
+    exception = record["exception"]
+    if exception is not None and exception.type is not None:
+        import traceback
+
+        entry["exception"] = {
+            "type": exception.type.__name__,
+            "value": str(exception.value),
+            "traceback": "".join(traceback.format_exception(exception.type, exception.value, exception.traceback)),
+        }
+    return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+class LogSampler:
+    """
+    Loguru filter keeping a fraction of records per level, overridden per route
+    for records bound with `route=`. Rates are in [0, 1]; unlisted levels and
+    routes are always kept.
+    """
+
+    def __init__(self, level_rates: dict[str, float], route_rates: dict[str, float]):
+        self.level_rates = {level.upper(): rate for level, rate in level_rates.items()}
+        self.route_rates = route_rates
+        self.sampled_out = 0
+
+    def __call__(self, record: dict[str, Any]) -> bool:
+        route = record["extra"].get("route")
+        rate = self.route_rates.get(route) if route is not None else None
+        if rate is None:
+            rate = self.level_rates.get(record["level"].name)
+        if rate is None or rate >= 1.0 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+def _add_request_id(record: dict[str, Any]) -> None:
+    record["extra"].setdefault("request_id", request_id_var.get() or "-")
+
+
+log_sampler = LogSampler(settings.LOG_SAMPLE_RATES, settings.LOG_ROUTE_SAMPLE_RATES)
+log_sink = BufferedSink(sys.stdout, settings.LOG_BUFFER_SIZE, serialize=settings.LOG_FORMAT == "json")
+atexit.register(log_sink.close)
 
 # Remove default loguru handlers (avoid duplicate logs)
 logger.remove()
+logger.configure(patcher=_add_request_id)
 
 # Console logger (useful for dev & container logs)
 logger.add(
-    sink=lambda msg: print(msg, end=""),  # portable fallback, but we can also use sys.stderr
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
+    sink=log_sink,
+    format="{message}" if log_sink.serialize else TEXT_FORMAT,
     level="DEBUG" if settings.DEBUG else "INFO",
-    enqueue=True,  # safe for multi-thread/process
+    filter=log_sampler,
+    colorize=not log_sink.serialize and sys.stdout.isatty(),
 )
 
 # If running in production, ensure logs directory exists and add file logger
@@ -27,6 +194,8 @@ if settings.ENVIRONMENT == "production":
             rotation="10 MB",       # rotate after 10 MB
             retention="10 days",    # keep logs for 10 days
             level="INFO",
+            filter=log_sampler,
+            serialize=log_sink.serialize,
             enqueue=True,          # safe write across processes
             backtrace=True,        # show python backtrace
             diagnose=False,        # avoid huge diagnostics in production unless needed
@@ -35,13 +204,16 @@ if settings.ENVIRONMENT == "production":
 def log_exception(exc: Exception, extra: dict | None = None) -> None:
     """
     Log an exception with optional extra context.
-    Use this in exception handlers to get consistent logs.
+    Client errors (status < 500) are logged as one line without a traceback;
+    everything else gets the full traceback.
     """
     try:
-        if extra:
-            logger.exception(str(exc), extra=extra)
+        bound = logger.bind(**extra) if extra else logger
+        status_code = getattr(exc, "status_code", 500)
+        if status_code < 500:
+            bound.info("{} {}", status_code, getattr(exc, "detail", exc))
         else:
-            logger.exception(str(exc))
+            bound.opt(exception=exc).error(str(exc))
     except Exception:
         # fallback to a simple log if something goes wrong in loguru
-        print("Logging failed for exception:", exc)
\ No newline at end of file
+        print("Logging failed for exception:", exc)
@@ -0,0 +1,216 @@
+"""
+Lightweight tracing shared by the API and the Celery worker.
+
+Spans follow the W3C trace-context model (trace id, span id, parent id and a
+sampled flag carried in a `traceparent` header), so they can be joined across
+processes. The sampling decision is made once at the root of a trace and
+inherited by every child span; unsampled spans only carry ids around and are
+never exported.
+"""
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from app.core.config import settings
+
+TRACEPARENT_HEADER = "traceparent"
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "sampled", "attributes", "status", "start", "end")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool, kind: str = "internal"):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes: dict[str, Any] = {}
+        self.status = "ok"
+        self.start = time.time()
+        self.end: Optional[float] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.sampled:
+            self.attributes[key] = value
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.set_attribute("error.type", type(exc).__name__)
+        self.set_attribute("error.message", str(exc)[:500])
+
+    def to_dict(self, service: str) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "service": service,
+            "start": round(self.start, 6),
+            "duration_ms": round(((self.end or time.time()) - self.start) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple[str, str, bool]]:
+    """(trace_id, parent span id, sampled) from a traceparent header, or None if malformed"""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+class InMemoryExporter:
+    """Keeps the most recent finished spans; for tests and offline inspection"""
+
+    def __init__(self, max_spans: int):
+        self.spans: deque[dict[str, Any]] = deque(maxlen=max_spans)
+
+    def export(self, span: dict[str, Any]) -> None:
+        self.spans.append(span)
+
+    def close(self) -> None:
+        pass
+
+
+class FileExporter:
+    """
+    Appends finished spans as NDJSON from a writer thread, so exporting never
+    blocks the event loop. The queue is bounded; spans beyond it are dropped
+    and counted.
+    """
+
+    def __init__(self, path: str, max_queue: int = 10_000):
+        self.path = Path(path)
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._pid = 0
+
+    def export(self, span: dict[str, Any]) -> None:
+        if self._pid != os.getpid():
+            # (Re)start after fork: preloaded gunicorn workers and Celery prefork children
+            self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            spans = [span for span in batch if span is not None]
+            if spans:
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(span, default=str, separators=(",", ":")) + "\n" for span in spans))
+            if len(spans) != len(batch):
+                return
+
+    def close(self, timeout: float = 2.0) -> None:
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+
+class Tracer:
+    def __init__(self, service: str, sample_rate: float, exporter, enabled: bool = True):
+        self.service = service
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.enabled = enabled
+        self._current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+    def current_span(self) -> Optional[Span]:
+        return self._current.get()
+
+    def start_span(self, name: str, kind: str = "internal", traceparent: Optional[str] = None,
+                   parent: Optional[Span] = None) -> Span:
+        """
+        New span (not made current). The parent is, in order: `parent`, the
+        remote context in `traceparent`, the current span. Without any of them
+        a new trace starts and the head sampling decision is taken here.
+        """
+        parent = parent or self.current_span()
+        remote = parse_traceparent(traceparent) if traceparent else None
+        if remote is not None:
+            trace_id, parent_id, sampled = remote
+        elif parent is not None:
+            trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+        else:
+            trace_id, parent_id, sampled = os.urandom(16).hex(), None, random.random() < self.sample_rate
+        return Span(name, trace_id, parent_id, sampled, kind)
+
+    def end_span(self, span: Span, exc: Optional[BaseException] = None) -> None:
+        if exc is not None:
+            span.record_error(exc)
+        span.end = time.time()
+        if span.sampled:
+            self.exporter.export(span.to_dict(self.service))
+
+    def activate(self, span: Span):
+        """Make `span` current; returns a token for `deactivate`"""
+        return self._current.set(span)
+
+    def deactivate(self, token) -> None:
+        self._current.reset(token)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", traceparent: Optional[str] = None) -> Iterator[Span]:
+        span = self.start_span(name, kind, traceparent)
+        token = self.activate(span)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        else:
+            self.end_span(span)
+        finally:
+            self.deactivate(token)
+
+
+def _build_exporter():
+    if settings.TRACING_EXPORTER == "file":
+        return FileExporter(settings.TRACING_FILE_PATH)
+    return InMemoryExporter(settings.TRACING_MEMORY_MAX_SPANS)
+
+
+tracer = Tracer(
+    service=settings.APP_NAME,
+    sample_rate=settings.TRACING_SAMPLE_RATE,
+    exporter=_build_exporter(),
+    enabled=settings.TRACING_ENABLED,
+)
+atexit.register(lambda: tracer.exporter.close())
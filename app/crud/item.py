@@ -0,0 +1,57 @@
+from typing import List, Optional
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models.user import NewItem
+from app.schemas.item import ItemCreate
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Smallest string greater than every string starting with `prefix` (None if unbounded)"""
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None
+
+
+class CRUDItem(CRUDBase[NewItem, ItemCreate, ItemCreate]):
+    async def list_after(self, db: AsyncSession, *, after_id: Optional[int], limit: int) -> List[NewItem]:
+        """Keyset page ordered by id: cost is independent of how deep the page is."""
+        query = select(NewItem).order_by(NewItem.id).limit(limit)
+        if after_id is not None:
+            query = query.where(NewItem.id > after_id)
+        return (await db.execute(query)).scalars().all()
+
+    async def by_name_prefix(
+            self, db: AsyncSession, *, prefix: str, after_id: Optional[int], limit: int
+    ) -> List[NewItem]:
+        """
+        Items whose name starts with `prefix`, ordered by (name, id), as the
+        half-open range [prefix, prefix_upper_bound(prefix)).
+
+        The range only equals "starts with" in code-point order. Linguistic
+        collations such as en_US.utf8 skip punctuation and spaces at first,
+        so names starting with e.g. "a-" would sort outside the range and be
+        lost. On PostgreSQL the name is therefore compared and ordered with
+        COLLATE "C", served by ix_new_items_name_c; SQLite's default binary
+        collation already is code-point order.
+        """
+        name = NewItem.name
+        if db.get_bind().dialect.name == "postgresql":
+            name = name.collate("C")
+        query = select(NewItem).where(name >= prefix)
+        upper = prefix_upper_bound(prefix)
+        if upper is not None:
+            query = query.where(name < upper)
+        if after_id is not None:
+            # The cursor is just the last id; its name is looked up through the primary key
+            last_name = select(NewItem.name).where(NewItem.id == after_id).scalar_subquery()
+            query = query.where(tuple_(name, NewItem.id) > tuple_(last_name, after_id))
+        query = query.order_by(name, NewItem.id).limit(limit)
+        return (await db.execute(query)).scalars().all()
+
+item = CRUDItem(NewItem)
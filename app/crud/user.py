@@ -1,10 +1,12 @@
-from typing import Optional
+import heapq
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Integer, Select, String, bindparam, case, func, literal_column, or_, select, tuple_, update
 from pydantic import EmailStr
 
-from app.crud.base import CRUDBase
-from app.models.user import User
+from app.crud.base import CRUDBase, escape_like
+from app.models.user import User, UserTombstone
 from app.schemas.user import UserCreate, UserUpdate
 from app.services.security import hash_password
 
@@ -19,6 +21,126 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         await db.refresh(db_obj)
         return db_obj
 
+    async def update(
+            self,
+            db: AsyncSession,
+            *,
+            db_obj: User,
+            obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        """Override the update method to hash a new password."""
+        update_data = dict(obj_in) if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+        password = update_data.pop("password", None)
+        if password:
+            update_data["hashed_password"] = hash_password(password)
+        return await super().update(db, db_obj=db_obj, obj_in=update_data)
+
+    async def replace_password_hash(self, db: AsyncSession, *, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """
+        Swap in a rehash of the same password, unless the password was changed
+        meanwhile. updated_at is kept: nothing visible changed, so the change
+        feed should not report the user.
+        """
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash, updated_at=User.updated_at)
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    async def get_by_id(self, db: AsyncSession, user_id: int) -> Optional[User]:
+        """Get user by primary key."""
+        return await self.get(db, user_id)
+
+    async def list_users(self, db: AsyncSession, *, limit: int = 50, offset: int = 0) -> List[User]:
+        """Page of users ordered by id."""
+        return await self.get_multi(db, skip=offset, limit=limit)
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[User]:
+        """Delete a user and leave a tombstone for the change feed, in one transaction."""
+        obj = await self.get(db, id)
+        if obj:
+            await db.delete(obj)
+            db.add(UserTombstone(user_id=id))
+            await db.commit()
+        return obj
+
+    async def changes_since(
+            self,
+            db: AsyncSession,
+            *,
+            after: Optional[tuple[datetime, int]],
+            until: datetime,
+            limit: int,
+    ) -> List[tuple[datetime, int, Optional[User]]]:
+        """
+        Up to `limit` changes ordered by (timestamp, user id), strictly after
+        `after` and not newer than `until`: (updated_at, id, user) for live
+        users and (deleted_at, user_id, None) for deleted ones.
+        Both sides are keyset scans over their (timestamp, id) indexes.
+        """
+        users = select(User).where(User.updated_at <= until)
+        tombstones = select(UserTombstone).where(UserTombstone.deleted_at <= until)
+        if after is not None:
+            users = users.where(tuple_(User.updated_at, User.id) > tuple_(*after))
+            tombstones = tombstones.where(tuple_(UserTombstone.deleted_at, UserTombstone.user_id) > tuple_(*after))
+        users = users.order_by(User.updated_at, User.id).limit(limit)
+        tombstones = tombstones.order_by(UserTombstone.deleted_at, UserTombstone.user_id).limit(limit)
+
+        live = [(u.updated_at, u.id, u) for u in (await db.execute(users)).scalars()]
+        deleted = [(t.deleted_at, t.user_id, None) for t in (await db.execute(tombstones)).scalars()]
+        return list(heapq.merge(live, deleted, key=lambda change: change[:2]))[:limit]
+
+    def search_query(self, *, q: str, after: Optional[tuple[int, int]], limit: int, min_substring: int = 3) -> Select:
+        """
+        Users whose email or username contains `q` (case-insensitive), selecting
+        (rank, User) ordered by rank, username, id. Rank 0 is an exact match,
+        1 a prefix match, 2 a substring match. Queries shorter than
+        `min_substring` only match prefixes, since trigram indexes cannot serve them.
+        `after` is the (rank, id) of the last row of the previous page.
+
+        On PostgreSQL the LIKE filters on lower(...) are served by the
+        text_pattern_ops and pg_trgm indexes; elsewhere (SQLite tests) the same
+        query simply scans.
+        """
+        q = q.lower()
+        email, username = func.lower(User.email), func.lower(User.username)
+        # Patterns are rendered inline: a prefix LIKE can only use the btree
+        # index when the planner sees a constant, not a prepared-statement parameter
+        prefix = bindparam("prefix", escape_like(q) + "%", type_=String, literal_execute=True)
+        substring = bindparam("substring", "%" + escape_like(q) + "%", type_=String, literal_execute=True)
+
+        if len(q) >= min_substring:
+            matches = or_(email.like(substring, escape="\\"), username.like(substring, escape="\\"))
+        else:
+            matches = or_(email.like(prefix, escape="\\"), username.like(prefix, escape="\\"))
+        rank = case(
+            (or_(email == q, username == q), literal_column("0", Integer)),
+            (or_(email.like(prefix, escape="\\"), username.like(prefix, escape="\\")), literal_column("1", Integer)),
+            else_=literal_column("2", Integer),
+        )
+
+        query = select(rank.label("rank"), User).where(matches)
+        if after is not None:
+            after_rank, after_id = after
+            after_username = select(func.lower(User.username)).where(User.id == after_id).scalar_subquery()
+            query = query.where(tuple_(rank, username, User.id) > tuple_(after_rank, after_username, after_id))
+        return query.order_by(rank, username, User.id).limit(limit)
+
+    async def search(
+            self,
+            db: AsyncSession,
+            *,
+            q: str,
+            after: Optional[tuple[int, int]],
+            limit: int,
+            min_substring: int = 3,
+    ) -> List[tuple[int, User]]:
+        """Run `search_query`; returns (rank, user) pairs."""
+        query = self.search_query(q=q, after=after, limit=limit, min_substring=min_substring)
+        return [(row.rank, row.User) for row in await db.execute(query)]
+
     async def get_by_email(self, db: AsyncSession, *, email: EmailStr) -> Optional[User]:
         """Get user by email (user-specific method)."""
         res = await db.execute(select(User).where(User.email == email))
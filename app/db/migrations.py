@@ -1,18 +1,32 @@
+import ast
+import asyncio
 import os
-from alembic.config import Config
-from alembic import command
-from typing import Optional
+import time
+from typing import Any, Optional
 from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
 from app.core.config import settings
 
-def get_alembic_config(alembic_ini_path: Optional[str] = None) -> Config:
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+VERSIONS_DIR = PROJECT_ROOT / "alembic" / "versions"
+
+# pg_advisory_lock key shared by every process that may run migrations
+MIGRATION_LOCK_KEY = 864_100_000_031
+
+
+def get_alembic_config(alembic_ini_path: Optional[str] = None):
     """
     Load alembic Config and set sqlalchemy.url from settings.SYNC_DATABASE_URL
     (or fallback to DATABASE_URL with +asyncpg removed).
     """
-    project_root = Path(__file__).resolve().parents[2]  # adjust if needed
+    from alembic.config import Config
+
     if not alembic_ini_path:
-        alembic_ini_path = os.path.join(project_root, "alembic.ini")
+        alembic_ini_path = os.path.join(PROJECT_ROOT, "alembic.ini")
 
     cfg = Config(alembic_ini_path)
 
@@ -28,13 +42,99 @@ def get_alembic_config(alembic_ini_path: Optional[str] = None) -> Config:
 
     # ensure script_location configured (optional)
     if not cfg.get_main_option("script_location"):
-        cfg.set_main_option("script_location", os.path.join(project_root, "alembic"))
+        cfg.set_main_option("script_location", os.path.join(PROJECT_ROOT, "alembic"))
 
     return cfg
 
 def run_migrations() -> None:
     """
     Run alembic upgrade head programmatically.
+    Blocking (and env.py starts its own event loop), so call it off the event loop.
     """
+    from alembic import command
+
     cfg = get_alembic_config()
     command.upgrade(cfg, "head")
+
+
+def script_heads(versions_dir: Path = VERSIONS_DIR) -> set[str]:
+    """
+    Head revision(s) of the migration scripts, read from the files' `revision` /
+    `down_revision` literals without importing Alembic.
+    """
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in versions_dir.glob("*.py"):
+        values: dict[str, Any] = {}
+        for node in ast.parse(path.read_text(encoding="utf-8")).body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1:
+                target, value = node.targets[0], node.value
+            elif isinstance(node, ast.AnnAssign) and node.value is not None:
+                target, value = node.target, node.value
+            else:
+                continue
+            if isinstance(target, ast.Name) and target.id in ("revision", "down_revision"):
+                values[target.id] = ast.literal_eval(value)
+        if "revision" not in values:
+            continue
+        revisions.add(values["revision"])
+        down = values.get("down_revision")
+        if isinstance(down, str):
+            parents.add(down)
+        elif down:
+            parents.update(down)
+    return revisions - parents
+
+
+async def current_revisions(conn: AsyncConnection) -> set[str]:
+    """Revision(s) the database is stamped with (empty if never migrated)"""
+    try:
+        result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+    except (ProgrammingError, OperationalError):
+        # alembic_version does not exist yet
+        await conn.rollback()
+        return set()
+    revisions = {row[0] for row in result}
+    await conn.commit()
+    return revisions
+
+
+async def migrate_if_needed(engine) -> dict[str, Any]:
+    """
+    Startup migration gate:
+    1. compare the DB revision with the script head and skip Alembic when they match;
+    2. otherwise take a Postgres advisory lock so only one process migrates,
+       re-check (another worker may have finished meanwhile) and run the upgrade
+       in a worker thread.
+    Returns the action taken and step timings in milliseconds.
+    """
+    report: dict[str, Any] = {"action": "skipped"}
+    started = time.perf_counter()
+
+    def lap(name: str) -> None:
+        report[f"{name}_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    heads = script_heads()
+    async with engine.connect() as conn:
+        current = await current_revisions(conn)
+        lap("check")
+        if current == heads:
+            return report
+
+        use_lock = conn.dialect.name == "postgresql"
+        if use_lock:
+            await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            await conn.commit()
+            lap("lock")
+        try:
+            if await current_revisions(conn) == heads:
+                report["action"] = "migrated_by_other_process"
+                return report
+            await asyncio.to_thread(run_migrations)
+            report["action"] = "upgraded"
+            lap("upgrade")
+        finally:
+            if use_lock:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                await conn.commit()
+    return report
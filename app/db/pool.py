@@ -0,0 +1,18 @@
+import time
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.utils.stats import WindowStats
+
+# Time spent waiting for a pooled connection (seconds), read by admission control
+checkout_wait = WindowStats()
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            checkout_wait.add(time.perf_counter() - start)
@@ -1,22 +1,56 @@
+import math
+from typing import AsyncGenerator, Optional
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session
+
 from app.core.config import settings
-from typing import AsyncGenerator
+from app.core.context import time_left
+from app.db.pool import TimedAsyncQueuePool
 
-# Async engine
+# Async engine (the timed pool feeds checkout wait times to admission control)
 engine = create_async_engine(
     settings.DATABASE_URL,
     future=True,
     echo=False,
     pool_pre_ping=True,
+    poolclass=TimedAsyncQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
 )
 
+
+class DeadlineSession(Session):
+    """Session whose transactions are bounded by the request deadline (see statement_timeout_sql)"""
+
+
+def statement_timeout_sql(remaining: Optional[float]) -> Optional[str]:
+    """SET LOCAL for a transaction started with `remaining` seconds left, or None without a deadline"""
+    if remaining is None:
+        return None
+    return f"SET LOCAL statement_timeout = {max(1, math.ceil(remaining * 1000))}"
+
+
+@event.listens_for(DeadlineSession, "after_begin")
+def _apply_statement_timeout(session, transaction, connection) -> None:
+    # Server-side backstop for the request deadline: Postgres aborts the statement
+    # even if the client-side cancel never arrives. Scoped to the transaction.
+    sql = statement_timeout_sql(time_left())
+    if sql is not None and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(sql)
+
+
 # Async session maker
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     expire_on_commit=False,
     class_=AsyncSession,
+    sync_session_class=DeadlineSession,
 )
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    """Request session; its transactions inherit the request deadline from `deadline_var`"""
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
@@ -5,7 +5,7 @@ import socket
 from typing import Any
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -13,32 +13,72 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from sqlalchemy import text
 
 from app.core.config import settings
-from app.core.logger import logger, log_exception
+from app.core.context import REQUEST_ID_HEADER, new_request_id, request_id_var
+from app.core.logger import logger, log_exception, log_sink
 from app.core.exceptions import AppException
 from app.api.v1.api_router import api_router
 from app.db.session import engine
+from app.db.warmup import warm_up
+from app.services import admission, loop_monitor, profiling, tracing, traffic_capture
+from app.services.deadline import RequestDeadlineMiddleware
+from app.services.redis_client import close_redis
+from app.services.task_events import task_event_hub
 
 
-# Lifespan — migrations on startup + engine disposal on shutdown
+# Lifespan — migrations on startup + engine/Redis disposal on shutdown
 @asynccontextmanager
 async def lifespan(fastapi_app: FastAPI):
+    startup_started = time.perf_counter()
+    fastapi_app.state.startup_timings = {}
+    fastapi_app.state.ready = False
+
     if settings.RUN_MIGRATIONS_ON_STARTUP:
-        print("Running database migrations...")
         try:
-            from app.db.migrations import run_migrations
+            from app.db.migrations import migrate_if_needed
 
-            await run_migrations()
-            print("Database migrations completed successfully")
+            report = await migrate_if_needed(engine)
+            fastapi_app.state.startup_timings["migrations"] = report
+            print(f"Database migrations: {report}")
         except Exception as e:
             print(f"Error running migrations: {e}")
             if settings.ENVIRONMENT == "production":
                 raise
 
+    # Warm the pool and prepared statements so the first requests don't pay for it
+    warmup_connections = min(settings.DB_WARMUP_CONNECTIONS, settings.DB_POOL_SIZE)
+    if warmup_connections > 0:
+        try:
+            report = await asyncio.wait_for(warm_up(engine, warmup_connections), settings.DB_WARMUP_TIMEOUT_SECONDS)
+            fastapi_app.state.startup_timings["warmup"] = report
+            print(f"Database warm-up: {report}")
+        except Exception as e:
+            # Not fatal: requests will connect lazily and /health reports the database state
+            fastapi_app.state.startup_timings["warmup"] = {"error": str(e) or type(e).__name__}
+            print(f"Error warming up database connections: {e!r}")
+
+    if settings.ADMISSION_ENABLED:
+        admission.controller.start()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.monitor.start()
+
+    fastapi_app.state.ready = True
+    startup_ms = round((time.perf_counter() - startup_started) * 1000, 1)
+    fastapi_app.state.startup_timings["startup_ms"] = startup_ms
+    print(f"Startup completed in {startup_ms} ms")
+
     yield
 
-    # Dispose DB engine on shutdown
+    fastapi_app.state.ready = False
+    await admission.controller.stop()
+    await loop_monitor.monitor.stop()
+    if settings.TRAFFIC_CAPTURE_ENABLED:
+        await traffic_capture.recorder.flush()
+
+    # Dispose DB engine and Redis client on shutdown
     await engine.dispose()
     print("Database engine disposed")
+    await task_event_hub.close()
+    await close_redis()
 
 
 # App instance
@@ -53,6 +93,7 @@ app = FastAPI(
     openapi_tags=[
         {"name": "users", "description": "User management"},
         {"name": "authentication", "description": "Auth operations"},
+        {"name": "items", "description": "Item catalog and bulk ingest"},
         {"name": "tasks", "description": "Background tasks"},
     ],
 )
@@ -111,9 +152,29 @@ async def health_check():
         info["checks"]["redis"] = f"error: {str(e)}"
         info["status"] = "degraded"
 
+    if settings.ADMISSION_ENABLED:
+        info["checks"]["admission"] = admission.controller.stats()
+    if settings.LOOP_MONITOR_ENABLED:
+        info["checks"]["event_loop"] = loop_monitor.monitor.stats()
+    info["checks"]["logging"] = log_sink.stats()
+
     return info
 
 
+@app.get("/ready")
+async def readiness_check(request: Request):
+    """Readiness probe: 503 until startup (migrations, warm-up) has finished"""
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready", "startup": request.app.state.startup_timings}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return loop_monitor.monitor.prometheus()
+
+
 @app.get("/")
 async def root():
     """Application root endpoint"""
@@ -147,12 +208,76 @@ async def add_security_headers(request: Request, call_next):
     return response
 
 
+# Opt-in traffic capture for replay (no middleware at all when disabled)
+if settings.TRAFFIC_CAPTURE_ENABLED:
+    app.middleware("http")(traffic_capture.capture_traffic)
+
+# Admin-gated request profiling (no middleware at all when disabled)
+if settings.PROFILING_ENABLED:
+    app.middleware("http")(profiling.profile_requests)
+
+
+def route_template(request: Request) -> str:
+    """Matched route path (e.g. /api/v1/users/users/{user_id}), falling back to the raw path"""
+    return getattr(request.scope.get("route"), "path", request.url.path)
+
+
+# Tracing: one server span per request, SQL spans per statement (no middleware when disabled)
+if settings.TRACING_ENABLED:
+    tracing.instrument_engine(engine)
+    app.middleware("http")(tracing.trace_requests)
+
+
+# Deadlines: cancel the endpoint (and its DB query) and answer 504 once the request runs out of time
+app.add_middleware(RequestDeadlineMiddleware)
+
+
+# Request id: taken from the caller or generated, visible to logs and Celery tasks
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    request_id = new_request_id(request.headers.get(REQUEST_ID_HEADER))
+    token = request_id_var.set(request_id)
+    start_time = time.perf_counter()
+    # Left set if the call raises, so the 500 handler (outside this middleware) still sees it
+    response = await call_next(request)
+    if settings.LOG_ACCESS_ENABLED:
+        logger.bind(
+            route=route_template(request),
+            method=request.method,
+            status=response.status_code,
+            duration_ms=round((time.perf_counter() - start_time) * 1000, 2),
+        ).info("{} {} {}", request.method, request.url.path, response.status_code)
+    request_id_var.reset(token)
+    response.headers[REQUEST_ID_HEADER] = request_id
+    return response
+
+
+# Admission control: registered last so it runs first and sheds before any other work
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    if not settings.ADMISSION_ENABLED:
+        return await call_next(request)
+
+    path = request.url.path
+    route = admission.controller.route_key(path)
+    if not await admission.controller.acquire(route, priority=admission.is_priority(path)):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Service overloaded, retry later"},
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+    try:
+        return await call_next(request)
+    finally:
+        admission.controller.release(route)
+
+
 # Exception handlers
 @app.exception_handler(AppException)
 async def app_exception_handler(request: Request, exc: AppException):
-    # Log with structured info
-    log_exception(exc, extra={"path": str(request.url.path), "method": request.method})
-    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+    # Log with structured info; client errors are logged without a traceback
+    log_exception(exc, extra={"path": str(request.url.path), "route": route_template(request), "method": request.method})
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers)
 
 
 @app.exception_handler(RequestValidationError)
@@ -164,8 +289,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
     # Generic fallback for unhandled exceptions
-    log_exception(exc, extra={"path": str(request.url.path), "method": request.method})
-    logger.exception("Unhandled error: %s", exc)
+    log_exception(exc, extra={"path": str(request.url.path), "route": route_template(request), "method": request.method})
     return JSONResponse(status_code=500, content={"detail": "Internal server error"})
 
 
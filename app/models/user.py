@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, DateTime, func,INT
+from sqlalchemy import String, DateTime, Index, func,INT
 from sqlalchemy.orm import Mapped, mapped_column
 from app.models.base import Base
 
@@ -20,6 +20,21 @@ class User(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
+    # Keyset order of the change feed (GET /users/changes)
+    __table_args__ = (Index("ix_users_updated_at_id", "updated_at", "id"),)
+
+
+class UserTombstone(Base):
+    """Marks a deleted user so the change feed can report the delete"""
+    __tablename__ = "user_tombstones"
+
+    user_id: Mapped[int] = mapped_column(primary_key=True)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __table_args__ = (Index("ix_user_tombstones_deleted_at_user_id", "deleted_at", "user_id"),)
+
 class NewItem(Base):
     __tablename__ = "new_items"
     id: Mapped[int] = mapped_column(INT, primary_key=True, index=True)
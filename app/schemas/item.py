@@ -0,0 +1,28 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional
+
+
+class ItemBase(BaseModel):
+    name: str = Field(..., min_length=1, max_length=1000)
+    description: Optional[str] = None
+
+
+class ItemCreate(ItemBase):
+    pass
+
+
+class ItemOut(ItemBase):
+    id: int
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Keyset page; pass `next_cursor` back as ?after= (null when there are no more rows)
+class ItemPage(BaseModel):
+    items: list[ItemOut]
+    next_cursor: Optional[str] = None
+
+
+class IngestResult(BaseModel):
+    inserted: int
+    batches: int
+    elapsed_ms: float
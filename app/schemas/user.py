@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional
+from typing import Literal, Optional
 
 
 # Base class for all user models
@@ -31,6 +31,30 @@ class UserOut(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# One entry of the user change feed; `user` is omitted for deletes
+class UserChange(BaseModel):
+    op: Literal["upsert", "delete"]
+    id: int
+    user: Optional[UserOut] = None
+
+
+class UserChangesPage(BaseModel):
+    changes: list[UserChange]
+    next_cursor: str  # pass back as ?since= to continue
+    has_more: bool
+
+
+# One user search result; `match` is how the query matched (exact, prefix or substring)
+class UserSearchHit(BaseModel):
+    match: Literal["exact", "prefix", "substring"]
+    user: UserOut
+
+
+class UserSearchPage(BaseModel):
+    items: list[UserSearchHit]
+    next_cursor: Optional[str] = None  # pass back as ?after= (null when there are no more results)
+
+
 # Class for changing user password
 class UserChangePassword(BaseModel):
     old_password: str
@@ -0,0 +1,133 @@
+import importlib.util
+import math
+import os
+from typing import Any, Optional
+
+from app.core.config import settings
+
+APP_PATH = "app.main:app"
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: affinity mask, capped by a cgroup v2 CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def auto_workers(
+        cpus: int,
+        db_max_connections: int,
+        pool_size: int,
+        max_overflow: int,
+) -> int:
+    """
+    One async worker per CPU, but never more workers than the DB connection budget
+    allows: each worker's pool may open pool_size + max_overflow connections.
+    """
+    per_worker = max(1, pool_size + max_overflow)
+    return max(1, min(cpus, db_max_connections // per_worker))
+
+
+def resolve_workers(requested: Optional[int] = None) -> int:
+    workers = requested if requested is not None else settings.SERVER_WORKERS
+    if workers > 0:
+        return workers
+    return auto_workers(
+        available_cpus(), settings.DB_MAX_CONNECTIONS, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    )
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def event_loop_impl() -> str:
+    return "uvloop" if _installed("uvloop") else "asyncio"
+
+
+def http_impl() -> str:
+    return "httptools" if _installed("httptools") else "h11"
+
+
+def server_config(workers: Optional[int] = None, host: Optional[str] = None, port: Optional[int] = None) -> dict[str, Any]:
+    return {
+        "host": host or settings.SERVER_HOST,
+        "port": port or settings.SERVER_PORT,
+        "workers": resolve_workers(workers),
+        "loop": event_loop_impl(),
+        "http": http_impl(),
+        "backlog": settings.SERVER_BACKLOG,
+        "keepalive": settings.SERVER_KEEPALIVE_SECONDS,
+        "timeout": settings.SERVER_TIMEOUT_SECONDS,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "supervisor": "gunicorn" if _installed("gunicorn") else "uvicorn",
+    }
+
+
+def _run_gunicorn(config: dict[str, Any]) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self) -> None:
+            options = {
+                "bind": f"{config['host']}:{config['port']}",
+                "workers": config["workers"],
+                "worker_class": "app.uvicorn_worker.TunedUvicornWorker",
+                "backlog": config["backlog"],
+                "keepalive": config["keepalive"],
+                "timeout": config["timeout"],
+                "graceful_timeout": config["timeout"],
+                "max_requests": config["max_requests"],
+                "max_requests_jitter": config["max_requests_jitter"],
+                # Import the app once in the master; forked workers share those pages
+                "preload_app": True,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+    Server().run()
+
+
+def _run_uvicorn(config: dict[str, Any]) -> None:
+    import uvicorn
+
+    # uvicorn's own supervisor spawns workers, so there is no preloading here
+    uvicorn.run(
+        APP_PATH,
+        host=config["host"],
+        port=config["port"],
+        workers=config["workers"],
+        loop=config["loop"],
+        http=config["http"],
+        backlog=config["backlog"],
+        timeout_keep_alive=config["keepalive"],
+        limit_max_requests=config["max_requests"] or None,
+    )
+
+
+def serve(workers: Optional[int] = None, host: Optional[str] = None, port: Optional[int] = None) -> None:
+    config = server_config(workers, host, port)
+    print(f"Starting server: {config}")
+    if config["workers"] > 1 and settings.TOKEN_REVOCATION_BACKEND == "memory":
+        print("Warning: TOKEN_REVOCATION_BACKEND=memory with several workers; "
+              "logout and refresh-token reuse are only seen by the worker that handled them. Use redis.")
+    if config["supervisor"] == "gunicorn":
+        _run_gunicorn(config)
+    else:
+        _run_uvicorn(config)
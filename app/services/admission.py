@@ -0,0 +1,197 @@
+import asyncio
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.db import pool as db_pool
+from app.db.session import engine
+from app.utils.stats import Ewma
+
+
+class AdmissionController:
+    """
+    Concurrency limiter in front of the routes.
+
+    - `limit` requests may run at once; the last `reserved` slots only go to
+      priority routes (health, login) so they keep working under overload.
+    - Optional per-route limits cap a single path prefix.
+    - Requests over the limit wait in a bounded queue for at most `max_wait`;
+      a full queue or an expired wait sheds the request (503).
+    - `limit` adapts (AIMD) to DB pool checkout waits and event-loop lag.
+    """
+
+    def __init__(
+            self,
+            *,
+            max_limit: int,
+            min_limit: int,
+            reserved: int,
+            route_limits: dict[str, int],
+            max_queue: int,
+            max_wait: float,
+            pool_wait_target: float,
+            loop_lag_target: float,
+            pool_saturated: Optional[Callable[[], bool]] = None,
+    ):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.limit = max_limit
+        self.reserved = reserved
+        self.route_limits = route_limits
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.pool_wait_target = pool_wait_target
+        self.loop_lag_target = loop_lag_target
+        self.pool_saturated = pool_saturated
+
+        self.in_flight = 0
+        self.shed_count = 0
+        self.pool_wait = Ewma(alpha=0.3)
+        self.loop_lag = Ewma(alpha=0.3)
+        self._route_in_flight: Counter[str] = Counter()
+        self._waiters: deque[tuple[Optional[str], bool, asyncio.Future]] = deque()
+        self._monitor: Optional[asyncio.Task] = None
+
+    def route_key(self, path: str) -> Optional[str]:
+        for prefix in self.route_limits:
+            if path.startswith(prefix):
+                return prefix
+        return None
+
+    def _can_admit(self, route: Optional[str], priority: bool) -> bool:
+        capacity = self.limit if priority else max(1, self.limit - self.reserved)
+        if self.in_flight >= capacity:
+            return False
+        if route is not None and self._route_in_flight[route] >= self.route_limits[route]:
+            return False
+        return True
+
+    def _waiter_ready(self) -> bool:
+        """A queued request could take a slot now; newcomers must not overtake it"""
+        return any(
+            self._can_admit(route, priority) for route, priority, future in self._waiters if not future.done()
+        )
+
+    def _admit(self, route: Optional[str]) -> None:
+        self.in_flight += 1
+        if route is not None:
+            self._route_in_flight[route] += 1
+
+    async def acquire(self, route: Optional[str], priority: bool = False) -> bool:
+        """Admit the request (possibly after queueing); False means shed it"""
+        # Waiters held back only by their own route limit don't block other routes
+        if self._can_admit(route, priority) and (priority or not self._waiter_ready()):
+            self._admit(route)
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.shed_count += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (route, priority, future)
+        self._waiters.append(entry)
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+            return True
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                return True  # admitted right as the wait expired
+            self.shed_count += 1
+            return False
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(route)
+            raise
+        finally:
+            if not future.done() or future.cancelled():
+                try:
+                    self._waiters.remove(entry)
+                except ValueError:
+                    pass
+
+    def release(self, route: Optional[str]) -> None:
+        self.in_flight -= 1
+        if route is not None:
+            self._route_in_flight[route] -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        for entry in list(self._waiters):
+            route, priority, future = entry
+            if future.done():
+                continue
+            if self._can_admit(route, priority):
+                self._waiters.remove(entry)
+                self._admit(route)
+                future.set_result(None)
+
+    def adjust(self, pool_wait: float, loop_lag: float) -> None:
+        """Feed one control interval's signals (seconds) and adapt the limit"""
+        self.pool_wait.update(pool_wait)
+        self.loop_lag.update(loop_lag)
+        overloaded = (
+                self.pool_wait.value > self.pool_wait_target
+                or self.loop_lag.value > self.loop_lag_target
+                or (self.pool_saturated is not None and self.pool_saturated())
+        )
+        if overloaded:
+            self.limit = max(self.min_limit, int(self.limit * 0.9))
+        else:
+            self.limit = min(self.max_limit, self.limit + 1)
+            self._wake_waiters()
+
+    async def _run_monitor(self, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            # Oversleep beyond the interval is time the loop spent blocked
+            lag = max(0.0, loop.time() - started - interval)
+            _, mean_wait, _ = db_pool.checkout_wait.snapshot()
+            self.adjust(mean_wait or 0.0, lag)
+
+    def start(self, interval: float = 0.25) -> None:
+        if self._monitor is None or self._monitor.done():
+            self._monitor = asyncio.create_task(self._run_monitor(interval))
+
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "shed": self.shed_count,
+            "pool_wait_ms": round(self.pool_wait.value * 1000, 2),
+            "loop_lag_ms": round(self.loop_lag.value * 1000, 2),
+        }
+
+
+def _pool_saturated() -> bool:
+    pool = engine.pool
+    return pool.checkedout() >= settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW and pool.checkedin() == 0
+
+
+controller = AdmissionController(
+    max_limit=settings.ADMISSION_MAX_CONCURRENCY,
+    min_limit=settings.ADMISSION_MIN_CONCURRENCY,
+    reserved=settings.ADMISSION_RESERVED_SLOTS,
+    route_limits=settings.ADMISSION_ROUTE_LIMITS,
+    max_queue=settings.ADMISSION_MAX_QUEUE_DEPTH,
+    max_wait=settings.ADMISSION_MAX_QUEUE_WAIT_MS / 1000,
+    pool_wait_target=settings.ADMISSION_POOL_WAIT_TARGET_MS / 1000,
+    loop_lag_target=settings.ADMISSION_LOOP_LAG_TARGET_MS / 1000,
+    pool_saturated=_pool_saturated,
+)
+
+
+def is_priority(path: str) -> bool:
+    return path in settings.ADMISSION_PRIORITY_PATHS
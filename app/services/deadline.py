@@ -0,0 +1,111 @@
+import asyncio
+import math
+import time
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import DBAPIError
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.context import DEADLINE_HEADER, deadline_var
+from app.core.logger import logger
+
+QUERY_CANCELED = "57014"  # Postgres sqlstate when statement_timeout fires
+
+
+def resolve_timeout(path: str, requested_ms: Optional[str]) -> Optional[float]:
+    """
+    Seconds the request may take: the client's X-Request-Timeout-Ms if valid,
+    otherwise the default of the longest matching route prefix. The header is
+    capped at REQUEST_DEADLINE_MAX_SECONDS or the route default, whichever is
+    longer, and uncapped on routes without a deadline. None means no deadline.
+    """
+    timeout = settings.REQUEST_DEADLINE_SECONDS
+    matches = [prefix for prefix in settings.REQUEST_DEADLINE_ROUTES if path.startswith(prefix)]
+    if matches:
+        timeout = settings.REQUEST_DEADLINE_ROUTES[max(matches, key=len)]
+
+    if requested_ms:
+        try:
+            requested = float(requested_ms) / 1000
+        except ValueError:
+            requested = 0.0
+        if 0 < requested < math.inf:
+            if timeout <= 0:
+                return requested
+            return min(requested, max(settings.REQUEST_DEADLINE_MAX_SECONDS, timeout))
+    return timeout if timeout > 0 else None
+
+
+class RequestDeadlineMiddleware:
+    """
+    Runs each request under its deadline and answers 504 when it passes.
+
+    Plain ASGI rather than @app.middleware: hitting the deadline cancels the
+    task running the endpoint, and with it any in-flight asyncpg query
+    (asyncpg cancels it on the server), so the pooled connection is freed
+    right away. The deadline is also published in `deadline_var`, from which
+    every DB transaction gets a matching Postgres statement_timeout.
+
+    The deadline stops applying once the response has started, so streamed
+    bodies are never cut off halfway.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.REQUEST_DEADLINE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        timeout = resolve_timeout(scope["path"], Headers(scope=scope).get(DEADLINE_HEADER))
+        if timeout is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = expired = False
+
+        async def send_until_deadline(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+                timer.cancel()
+            await send(message)
+
+        # The app runs in its own task (which inherits deadline_var) so the deadline cancels
+        # only that task. A timer handle, not asyncio.timeout: the image runs Python 3.10.
+        token = deadline_var.set(time.monotonic() + timeout)
+        app_task = asyncio.ensure_future(self.app(scope, receive, send_until_deadline))
+
+        def expire() -> None:
+            nonlocal expired
+            expired = True
+            app_task.cancel()
+
+        timer = asyncio.get_running_loop().call_later(timeout, expire)
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not expired:
+                raise
+        except DBAPIError as e:
+            # statement_timeout fired on the server before the timer here
+            if started or getattr(e.orig, "sqlstate", None) != QUERY_CANCELED:
+                raise
+            expired = True
+        finally:
+            timer.cancel()
+            deadline_var.reset(token)
+
+        # Also when the app swallowed the cancellation: nothing was sent yet, so answer now
+        if expired and not started:
+            await self._deadline_exceeded(scope, receive, send, timeout)
+
+    async def _deadline_exceeded(self, scope: Scope, receive: Receive, send: Send, timeout: float) -> None:
+        logger.bind(path=scope["path"], method=scope["method"], timeout_s=timeout).warning(
+            "Request deadline of {} s exceeded: {} {}", timeout, scope["method"], scope["path"]
+        )
+        response = JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+        await response(scope, receive, send)
@@ -0,0 +1,258 @@
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Coroutine, Any, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+from app.services.redis_client import get_redis
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Headers that are recomputed when a stored response is replayed
+_SKIPPED_HEADERS = {"content-length", "x-process-time"}
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class IdempotencyRecord:
+    fingerprint: str
+    response: Optional[StoredResponse] = None  # None while the first request is in flight
+
+
+class IdempotencyStore(ABC):
+    """Storage for Idempotency-Key records (in-flight markers and completed responses)"""
+
+    @abstractmethod
+    async def reserve(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        """Claim the key. Returns None if claimed, otherwise the existing record."""
+
+    @abstractmethod
+    async def complete(self, key: str, fingerprint: str, response: StoredResponse) -> None:
+        """Store the final response and wake up waiting duplicates"""
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Drop an in-flight claim (the handler failed) so the client can retry"""
+
+    @abstractmethod
+    async def wait(self, key: str, timeout: float) -> Optional[IdempotencyRecord]:
+        """Wait until the key is no longer in flight; returns the current record"""
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """Per-process LRU store; duplicates wait on an asyncio.Event"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._records: OrderedDict[str, tuple[float, IdempotencyRecord]] = OrderedDict()
+        self._events: dict[str, asyncio.Event] = {}
+
+    def _get(self, key: str) -> Optional[IdempotencyRecord]:
+        item = self._records.get(key)
+        if item is None:
+            return None
+        expires_at, record = item
+        if expires_at < time.monotonic():
+            del self._records[key]
+            return None
+        self._records.move_to_end(key)
+        return record
+
+    def _put(self, key: str, record: IdempotencyRecord) -> None:
+        self._records[key] = (time.monotonic() + self.ttl, record)
+        self._records.move_to_end(key)
+        while len(self._records) > self.maxsize:
+            self._records.popitem(last=False)
+
+    async def reserve(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        record = self._get(key)
+        if record is not None:
+            return record
+        self._put(key, IdempotencyRecord(fingerprint))
+        self._events[key] = asyncio.Event()
+        return None
+
+    async def complete(self, key: str, fingerprint: str, response: StoredResponse) -> None:
+        self._put(key, IdempotencyRecord(fingerprint, response))
+        event = self._events.pop(key, None)
+        if event is not None:
+            event.set()
+
+    async def release(self, key: str) -> None:
+        self._records.pop(key, None)
+        event = self._events.pop(key, None)
+        if event is not None:
+            event.set()
+
+    async def wait(self, key: str, timeout: float) -> Optional[IdempotencyRecord]:
+        event = self._events.get(key)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._get(key)
+
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """Shared store for multi-worker deployments; claims use SET NX with a lock TTL"""
+
+    prefix = "idempotency:"
+    poll_interval = 0.05
+
+    def __init__(self, ttl: int, lock_ttl: int):
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+
+    @staticmethod
+    def _dump(record: IdempotencyRecord) -> str:
+        data: dict[str, Any] = {"fingerprint": record.fingerprint}
+        if record.response is not None:
+            data["status_code"] = record.response.status_code
+            data["headers"] = record.response.headers
+            data["body"] = base64.b64encode(record.response.body).decode()
+        return json.dumps(data)
+
+    @staticmethod
+    def _load(raw: Optional[str]) -> Optional[IdempotencyRecord]:
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        response = None
+        if "status_code" in data:
+            response = StoredResponse(data["status_code"], base64.b64decode(data["body"]), data["headers"])
+        return IdempotencyRecord(data["fingerprint"], response)
+
+    async def reserve(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        redis = get_redis()
+        marker = self._dump(IdempotencyRecord(fingerprint))
+        while True:
+            if await redis.set(self.prefix + key, marker, nx=True, ex=self.lock_ttl):
+                return None
+            record = self._load(await redis.get(self.prefix + key))
+            if record is not None:
+                return record
+            # Expired or released between SET and GET; try to claim again
+
+    async def complete(self, key: str, fingerprint: str, response: StoredResponse) -> None:
+        await get_redis().set(self.prefix + key, self._dump(IdempotencyRecord(fingerprint, response)), ex=self.ttl)
+
+    async def release(self, key: str) -> None:
+        await get_redis().delete(self.prefix + key)
+
+    async def wait(self, key: str, timeout: float) -> Optional[IdempotencyRecord]:
+        redis = get_redis()
+        deadline = time.monotonic() + timeout
+        delay = self.poll_interval
+        while True:
+            record = self._load(await redis.get(self.prefix + key))
+            if record is None or record.response is not None or time.monotonic() >= deadline:
+                return record
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+
+_store: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    global _store
+    if _store is None:
+        if settings.IDEMPOTENCY_BACKEND == "redis":
+            _store = RedisIdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LOCK_TTL_SECONDS)
+        else:
+            _store = MemoryIdempotencyStore(settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_TTL_SECONDS)
+    return _store
+
+
+def request_fingerprint(request: Request, body: bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.url.path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _replay(stored: StoredResponse) -> Response:
+    response = Response(content=stored.body, status_code=stored.status_code, headers=stored.headers)
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Route class for routers whose POST endpoints honour the Idempotency-Key header.
+    The first request runs the handler and stores its response; duplicates replay it
+    (waiting if the first one is still running) without executing the handler again.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key or request.method != "POST":
+                return await handler(request)
+            if len(key) > 255:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Idempotency-Key is too long")
+
+            store = get_idempotency_store()
+            store_key = f"{request.url.path}:{key}"
+            fingerprint = request_fingerprint(request, await request.body())
+            deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS
+
+            while True:
+                record = await store.reserve(store_key, fingerprint)
+                if record is None:
+                    break
+                if record.fingerprint != fingerprint:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Idempotency-Key was already used with a different request",
+                    )
+                if record.response is not None:
+                    return _replay(record.response)
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="A request with this Idempotency-Key is still being processed",
+                    )
+                record = await store.wait(store_key, remaining)
+                if record is not None and record.response is not None:
+                    return _replay(record.response)
+                # First request failed and released the key (or is still running): loop
+
+            try:
+                response = await handler(request)
+            except BaseException:
+                await store.release(store_key)
+                raise
+
+            # Server errors and streamed bodies are not replayed; the client may retry them
+            body = getattr(response, "body", None)
+            if response.status_code >= 500 or body is None:
+                await store.release(store_key)
+                return response
+
+            headers = {k: v for k, v in response.headers.items() if k.lower() not in _SKIPPED_HEADERS}
+            await store.complete(store_key, fingerprint, StoredResponse(response.status_code, bytes(body), headers))
+            return response
+
+        return idempotent_handler
@@ -0,0 +1,152 @@
+import csv
+import json
+import time
+from typing import Any, AsyncIterator, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import NewItem
+
+COLUMNS = ("name", "description")
+NAME_MAX_LENGTH = 1000
+
+
+class IngestError(ValueError):
+    """A malformed row; `line` is 1-based in the request body"""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+        self.message = message
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering more than one line"""
+    pending = b""
+    line_no = 0
+
+    def decode(line: bytes) -> str:
+        try:
+            return line.rstrip(b"\r").decode("utf-8")
+        except UnicodeDecodeError:
+            raise IngestError(line_no, "not valid UTF-8") from None
+
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield decode(line)
+        if len(pending) > max_line_bytes:
+            raise IngestError(line_no + 1, f"line longer than {max_line_bytes} bytes")
+    if pending.strip():
+        line_no += 1
+        yield decode(pending)
+
+
+def _row(line_no: int, name: Any, description: Any) -> tuple[str, Optional[str]]:
+    if not isinstance(name, str) or not name.strip():
+        raise IngestError(line_no, "name is required")
+    if len(name) > NAME_MAX_LENGTH:
+        raise IngestError(line_no, f"name longer than {NAME_MAX_LENGTH} characters")
+    if description is not None and not isinstance(description, str):
+        raise IngestError(line_no, "description must be a string")
+    return name, description or None
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[tuple[str, Optional[str]]]:
+    """One JSON object per line: {"name": ..., "description": ...}; blank lines are skipped"""
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise IngestError(line_no, f"invalid JSON ({e.msg})") from None
+        if not isinstance(obj, dict):
+            raise IngestError(line_no, "expected a JSON object")
+        yield _row(line_no, obj.get("name"), obj.get("description"))
+
+
+async def parse_csv(lines: AsyncIterator[str]) -> AsyncIterator[tuple[str, Optional[str]]]:
+    """
+    CSV with a header row containing `name` and optionally `description`.
+    Quoted fields may span lines: physical lines are joined until the quote
+    count is even, which is exact for RFC 4180 ("" escapes keep parity).
+    """
+    line_no = 0
+    record_start = 0
+    buffered: list[str] = []
+    header: Optional[list[str]] = None
+    async for line in lines:
+        line_no += 1
+        if not buffered:
+            record_start = line_no
+        buffered.append(line)
+        record = "\n".join(buffered)
+        if record.count('"') % 2:
+            continue
+        buffered = []
+        if not record.strip():
+            continue
+        try:
+            fields = next(csv.reader([record]))
+        except csv.Error as e:
+            raise IngestError(record_start, f"invalid CSV ({e})") from None
+        if header is None:
+            header = [field.strip().lower() for field in fields]
+            if "name" not in header:
+                raise IngestError(record_start, "header must contain a 'name' column")
+            continue
+        values = dict(zip(header, fields))
+        yield _row(record_start, values.get("name"), values.get("description"))
+    if buffered:
+        raise IngestError(record_start, "unterminated quoted field")
+
+
+async def copy_batch(db: AsyncSession, batch: list[tuple[str, Optional[str]]]) -> None:
+    """
+    Load one batch: asyncpg COPY on PostgreSQL, a multi-row INSERT elsewhere.
+    Runs inside the session's transaction either way.
+    """
+    conn = await db.connection()
+    if conn.dialect.driver == "asyncpg":
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(NewItem.__tablename__, records=batch, columns=COLUMNS)
+    else:
+        await conn.execute(insert(NewItem), [dict(zip(COLUMNS, row)) for row in batch])
+
+
+async def ingest(db: AsyncSession, rows: AsyncIterator[tuple[str, Optional[str]]], batch_size: int) -> dict[str, Any]:
+    """
+    Stream rows into new_items in batches of `batch_size`, so memory stays
+    bounded however large the body is. All batches share one transaction:
+    a bad row anywhere rolls back the whole load.
+    """
+    started = time.perf_counter()
+    inserted = batches = 0
+    batch: list[tuple[str, Optional[str]]] = []
+    try:
+        # SQLAlchemy's asyncpg adapter only BEGINs on the first statement it runs itself;
+        # without this a COPY issued on the driver connection would run in autocommit.
+        await db.execute(text("SELECT 1"))
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                await copy_batch(db, batch)
+                inserted, batches, batch = inserted + len(batch), batches + 1, []
+        if batch:
+            await copy_batch(db, batch)
+            inserted, batches = inserted + len(batch), batches + 1
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+    return {
+        "inserted": inserted,
+        "batches": batches,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -0,0 +1,157 @@
+import asyncio
+import bisect
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.utils.stats import Ewma
+
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag and reports what is blocking the loop.
+
+    - A heartbeat coroutine sleeps `interval` and records how late it wakes up
+      (EWMA, max and a histogram for /metrics).
+    - A watchdog thread notices when the heartbeat has been overdue for more
+      than `threshold` and snapshots the loop thread's stack at that moment,
+      i.e. while the blocking call is still running. Nothing is captured
+      while the loop is healthy, so the steady-state cost is one wake-up per
+      interval on each side.
+    """
+
+    def __init__(self, interval: float, threshold: float, max_reports: int, stack_limit: int = 30):
+        self.interval = interval
+        self.threshold = threshold
+        self.stack_limit = stack_limit
+        self.lag = Ewma(alpha=0.3)
+        self.max_lag = 0.0
+        self.blocked_count = 0
+        self.bucket_counts = [0] * (len(LAG_BUCKETS) + 1)
+        self.lag_sum = 0.0
+        self.samples = 0
+        self.reports: deque[dict[str, Any]] = deque(maxlen=max_reports)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._stall: Optional[dict[str, Any]] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def record(self, lag: float) -> None:
+        self.lag.update(lag)
+        self.max_lag = max(self.max_lag, lag)
+        self.lag_sum += lag
+        self.samples += 1
+        self.bucket_counts[bisect.bisect_left(LAG_BUCKETS, lag)] += 1
+
+    async def _run_heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._last_beat = time.monotonic()
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self._last_beat = time.monotonic()
+            self.record(lag)
+            stall, self._stall = self._stall, None
+            if stall is not None:
+                # The watchdog saw the start of the stall; now we know how long it lasted
+                stall["blocked_ms"] = round(lag * 1000, 1)
+                logger.bind(blocked_ms=stall["blocked_ms"], task=stall["task"]).warning(
+                    "Event loop blocked for {} ms in {}\n{}", stall["blocked_ms"], stall["task"], "".join(stall["stack"])
+                )
+
+    def _run_watchdog(self) -> None:
+        check_every = min(self.interval, self.threshold) / 2
+        while not self._stopped.wait(check_every):
+            overdue = time.monotonic() - self._last_beat - self.interval
+            if overdue > self.threshold and self._stall is None:
+                self._stall = self.capture()
+                self.blocked_count += 1
+                self.reports.append(self._stall)
+
+    def capture(self) -> dict[str, Any]:
+        """Stack of the loop thread and the task currently running on it"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame, limit=self.stack_limit) if frame is not None else []
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        return {
+            "at": time.time(),
+            "task": task.get_name() if task is not None else "<callback>",
+            "coroutine": getattr(task.get_coro(), "__qualname__", None) if task is not None else None,
+            "stack": stack,
+            "blocked_ms": None,
+        }
+
+    def start(self) -> None:
+        if self._heartbeat is not None and not self._heartbeat.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat = asyncio.create_task(self._run_heartbeat(), name="loop-lag-heartbeat")
+        self._watchdog = threading.Thread(target=self._run_watchdog, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def stats(self) -> dict[str, Any]:
+        last_block = None
+        if self.reports:
+            report = self.reports[-1]
+            last_block = {k: v for k, v in report.items() if k != "stack"}
+            last_block["site"] = report["stack"][-1].strip() if report["stack"] else None
+        return {
+            "lag_ms": round(self.lag.value * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "blocked_count": self.blocked_count,
+            "last_block": last_block,
+        }
+
+    def prometheus(self) -> str:
+        """Lag histogram and block counter in the Prometheus text format"""
+        lines = [
+            "# HELP event_loop_lag_seconds Delay between a scheduled wake-up and the loop running it.",
+            "# TYPE event_loop_lag_seconds histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(LAG_BUCKETS, self.bucket_counts):
+            cumulative += count
+            lines.append(f'event_loop_lag_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines += [
+            f'event_loop_lag_seconds_bucket{{le="+Inf"}} {self.samples}',
+            f"event_loop_lag_seconds_sum {self.lag_sum:.6f}",
+            f"event_loop_lag_seconds_count {self.samples}",
+            "# HELP event_loop_blocked_total Stalls longer than the block threshold.",
+            "# TYPE event_loop_blocked_total counter",
+            f"event_loop_blocked_total {self.blocked_count}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+monitor = LoopLagMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+    threshold=settings.LOOP_MONITOR_BLOCK_THRESHOLD_MS / 1000,
+    max_reports=settings.LOOP_MONITOR_MAX_REPORTS,
+)
@@ -0,0 +1,214 @@
+import asyncio
+import hmac
+import io
+import itertools
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from starlette.routing import Match
+
+from app.core.config import settings
+from app.core.logger import logger
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"  # format only, e.g. ?profile=pstats
+FORMAT_HEADER = "X-Profile-Format"
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+def frame_key(frame) -> tuple[str, str, int]:
+    """(name, file, line) of a frame; co_qualname (with the class) is 3.11+, co_name before that"""
+    code = frame.f_code
+    return getattr(code, "co_qualname", code.co_name), code.co_filename, frame.f_lineno
+
+
+class StackSampler:
+    """
+    Minimal sampling profiler: a thread records the stack of `thread_id`
+    every `interval` seconds. Works for async code because it samples whatever
+    the loop thread is executing, including other coroutines interleaved with
+    the profiled request.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[tuple[tuple[str, str, int], ...]] = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self.started = self.duration = 0.0
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_key(frame))
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+
+    def __enter__(self) -> "StackSampler":
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+
+    def speedscope(self, name: str) -> dict[str, Any]:
+        """Sampled profile in the speedscope file format (open at speedscope.app)"""
+        frame_index: dict[tuple[str, str, int], int] = {}
+        samples, weights = [], []
+        weight = round(self.interval * 1000, 3)
+        for stack, count in self.stacks.items():
+            samples.append([frame_index.setdefault(frame, len(frame_index)) for frame in stack])
+            weights.append(weight * count)
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": settings.APP_NAME,
+            "shared": {"frames": [{"name": n, "file": f, "line": line} for n, f, line in frame_index]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+class RequestProfiler:
+    """
+    Profiles single requests on demand (admin token in a header or query
+    flag) and every Nth request on configured routes into a rolling
+    directory of profile files. Only one request is profiled at a time.
+    """
+
+    def __init__(self, token: Optional[str], interval: float, sample_routes: dict[str, int], directory: str, max_files: int):
+        self.token = token
+        self.interval = interval
+        self.sample_routes = sample_routes
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._counters: dict[str, itertools.count] = {route: itertools.count(1) for route in sample_routes}
+        self.busy = False
+
+    def requested(self, request: Request) -> bool:
+        # Header only: a token in the URL would end up in access logs and captured traffic
+        supplied = request.headers.get(PROFILE_HEADER)
+        return bool(self.token and supplied and hmac.compare_digest(supplied, self.token))
+
+    def sampled(self, request: Request) -> Optional[str]:
+        """Route template if this request is the Nth on a sampled route"""
+        if not self.sample_routes:
+            return None
+        for route in request.app.router.routes:
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                every = self.sample_routes.get(route.path)
+                if every and next(self._counters[route.path]) % every == 0:
+                    return route.path
+                return None
+        return None
+
+    async def run(self, request: Request, call_next, fmt: str, consume: bool) -> tuple[Response, bytes, str]:
+        """
+        Run the request under the chosen profiler; returns (response, profile, file suffix).
+        With `consume` the response body is drained inside the profile as well.
+        """
+        name = f"{request.method} {request.url.path}"
+
+        async def call() -> Response:
+            response = await call_next(request)
+            if consume:
+                async for _ in response.body_iterator:
+                    pass
+            return response
+
+        self.busy = True
+        try:
+            if fmt in ("pstats", "cprofile"):
+                import cProfile
+                import pstats
+
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    response = await call()
+                finally:
+                    profiler.disable()
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(60)
+                return response, out.getvalue().encode(), ".pstats.txt"
+
+            with StackSampler(threading.get_ident(), self.interval) as sampler:
+                response = await call()
+            return response, json.dumps(sampler.speedscope(name)).encode(), ".speedscope.json"
+        finally:
+            self.busy = False
+
+    def _store(self, stem: str, suffix: str, data: bytes) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{stem}{suffix}"
+        path.write_bytes(data)
+        # Rolling buffer: names start with a timestamp, keep only the newest max_files
+        files = sorted(self.directory.glob("*.*"))
+        for old in files[:-self.max_files]:
+            old.unlink(missing_ok=True)
+        return path
+
+    async def store(self, route: str, method: str, suffix: str, data: bytes) -> Path:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        stem = f"{time.time_ns()}-{method}-{slug}"
+        return await asyncio.to_thread(self._store, stem, suffix, data)
+
+
+profiler = RequestProfiler(
+    token=settings.PROFILING_TOKEN,
+    interval=settings.PROFILING_INTERVAL_MS / 1000,
+    sample_routes=settings.PROFILING_SAMPLE_ROUTES,
+    directory=settings.PROFILING_DIR,
+    max_files=settings.PROFILING_MAX_FILES,
+)
+
+
+async def profile_requests(request: Request, call_next):
+    """HTTP middleware; only registered when PROFILING_ENABLED is set"""
+    on_demand = profiler.requested(request)
+    route = None if on_demand else profiler.sampled(request)
+    if not (on_demand or route) or profiler.busy:
+        return await call_next(request)
+
+    fmt = request.headers.get(FORMAT_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM) or "speedscope"
+    response, profile, suffix = await profiler.run(request, call_next, fmt.lower(), consume=on_demand)
+
+    if on_demand:
+        # The profile replaces the body; the endpoint's status is kept in a header
+        media_type = "application/json" if suffix.endswith(".json") else "text/plain"
+        return Response(
+            content=profile,
+            media_type=media_type,
+            headers={
+                "X-Profiled-Status": str(response.status_code),
+                "Content-Disposition": f'attachment; filename="profile{suffix}"',
+            },
+        )
+
+    try:
+        path = await profiler.store(route, request.method, suffix, profile)
+        logger.bind(route=route, profile=str(path)).debug("Stored sampled profile {}", path.name)
+    except OSError as e:
+        logger.warning("Unable to store profile: {}", e)
+    return response
@@ -0,0 +1,158 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.exceptions import TooManyRequestsException
+from app.core.logger import logger
+from app.services import redis_client
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Token bucket: `capacity` tokens, refilled at `capacity` per `period` seconds"""
+    capacity: int
+    period: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """Parse limits like "5/minute" or "100/hour" """
+        count, _, unit = value.partition("/")
+        unit = unit.strip().rstrip("s")
+        if unit not in _PERIODS:
+            raise ValueError(f"Unknown rate limit period in {value!r}")
+        if int(count) < 1:
+            raise ValueError(f"Rate limit must allow at least one request: {value!r}")
+        return cls(capacity=int(count), period=_PERIODS[unit])
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def acquire(self, key: str, rate: Rate) -> float:
+        """Take one token. Returns 0 when allowed, otherwise seconds until a token is available."""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets, bounded by LRU eviction"""
+
+    def __init__(self, maxsize: int, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def acquire(self, key: str, rate: Rate) -> float:
+        now = self.clock()
+        tokens, updated_at = self._buckets.get(key, (float(rate.capacity), now))
+        tokens = min(float(rate.capacity), tokens + (now - updated_at) * rate.refill_per_second)
+
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / rate.refill_per_second
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+# KEYS[1] = bucket; ARGV = capacity, refill per second, ttl (ms).
+# Uses the Redis clock so all workers agree on time.
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets shared by all workers; each check is one atomic Lua call"""
+
+    prefix = "ratelimit:"
+
+    def __init__(self):
+        self._script = None
+
+    async def acquire(self, key: str, rate: Rate) -> float:
+        if self._script is None:
+            self._script = redis_client.get_redis().register_script(_TOKEN_BUCKET_LUA)
+        ttl_ms = int(rate.period * 1000) + 1000
+        result = await self._script(
+            keys=[self.prefix + key], args=[rate.capacity, rate.refill_per_second, ttl_ms]
+        )
+        return float(result)
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, limits: dict[str, str]):
+        self.backend = backend
+        self.rates = {name: Rate.parse(value) for name, value in limits.items()}
+
+    async def hit(self, name: str, identity: str) -> None:
+        """Consume a token from bucket `name` for `identity`; raises 429 when it is empty"""
+        rate = self.rates.get(name)
+        if rate is None or not settings.RATE_LIMIT_ENABLED:
+            return
+        try:
+            retry_after = await self.backend.acquire(f"{name}:{identity}", rate)
+        except redis_client.RedisError as e:
+            # Fail open: a Redis outage must not lock everybody out
+            logger.warning("Rate limit backend unavailable: {}", e)
+            return
+        if retry_after > 0:
+            raise TooManyRequestsException(retry_after=retry_after)
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        if settings.RATE_LIMIT_BACKEND == "redis":
+            backend: RateLimitBackend = RedisRateLimitBackend()
+        else:
+            backend = MemoryRateLimitBackend(settings.RATE_LIMIT_CACHE_SIZE)
+        _limiter = RateLimiter(backend, settings.RATE_LIMITS)
+    return _limiter
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("X-Forwarded-For")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(route: str):
+    """Dependency applying the "<route>:ip" limit before the endpoint runs"""
+    async def dependency(request: Request) -> None:
+        await get_rate_limiter().hit(f"{route}:ip", client_ip(request))
+    return dependency
@@ -1,9 +1,51 @@
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from app.core.config import settings
+
+# passlib/bcrypt are imported when the first password is hashed or verified
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+SCHEMES = ("bcrypt", "argon2")
+
+
+@lru_cache(maxsize=1)
+def get_pwd_context() -> "CryptContext":
+    """
+    New hashes use PASSWORD_HASH_SCHEME at the configured cost; hashes made
+    with the other scheme or a different cost still verify but are reported
+    by `needs_update`, so they get upgraded on the next login.
+    """
+    from passlib.context import CryptContext
+
+    if settings.PASSWORD_HASH_SCHEME not in SCHEMES:
+        raise ValueError(f"Unknown PASSWORD_HASH_SCHEME {settings.PASSWORD_HASH_SCHEME!r}")
+    return CryptContext(
+        schemes=list(SCHEMES),
+        default=settings.PASSWORD_HASH_SCHEME,
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+        # argon2 needs argon2-cffi, but only once an argon2 hash is made or checked
+        argon2__rounds=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST_KIB,
+        argon2__parallelism=settings.ARGON2_PARALLELISM,
+    )
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `security.pwd_ctx` working without building it at import time
+    if name == "pwd_ctx":
+        return get_pwd_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash_password(raw: str) -> str:
-    return pwd_ctx.hash(raw)
+    return get_pwd_context().hash(raw)
 
 def verify_password(raw: str, hashed: str) -> bool:
-    return pwd_ctx.verify(raw, hashed)
+    return get_pwd_context().verify(raw, hashed)
+
+def needs_rehash(hashed: str) -> bool:
+    """Whether a hash that just verified should be replaced with one at the current scheme and cost"""
+    return settings.PASSWORD_REHASH_ON_LOGIN and get_pwd_context().needs_update(hashed)
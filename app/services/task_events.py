@@ -0,0 +1,149 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, AsyncIterator, Iterable, Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.services import redis_client, task_status
+
+
+class TaskEventHub:
+    """
+    One Redis pub/sub subscription per process, fanned out to every
+    connected stream through small per-client queues.
+    """
+
+    def __init__(self, channel: str, queue_size: int):
+        self.channel = channel
+        self.queue_size = queue_size
+        self._listeners: defaultdict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._reader: Optional[asyncio.Task] = None
+
+    def subscribe(self, task_ids: Iterable[str]) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        for task_id in task_ids:
+            self._listeners[task_id].add(queue)
+        self._ensure_reader()
+        return queue
+
+    def unsubscribe(self, task_ids: Iterable[str], queue: asyncio.Queue) -> None:
+        for task_id in task_ids:
+            queues = self._listeners.get(task_id)
+            if queues is None:
+                continue
+            queues.discard(queue)
+            if not queues:
+                del self._listeners[task_id]
+
+    def dispatch(self, data: str) -> None:
+        """Hand one published event to every queue watching its task"""
+        try:
+            event = json.loads(data)
+            queues = self._listeners.get(event["task_id"])
+        except (ValueError, KeyError, TypeError):
+            return
+        for queue in queues or ():
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow client; its periodic status re-check catches up
+                pass
+
+    def _ensure_reader(self) -> None:
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            pubsub = redis_client.get_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    self.dispatch(message["data"])
+            except redis_client.RedisError as e:
+                logger.warning("Task event subscription lost: {}", e)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            except redis_client.RedisError:
+                pass
+            self._reader = None
+
+
+task_event_hub = TaskEventHub(settings.TASK_EVENTS_CHANNEL, settings.TASK_EVENTS_QUEUE_SIZE)
+
+
+def format_sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_task_events(task_ids: list[str], hub: TaskEventHub = task_event_hub) -> AsyncIterator[str]:
+    """
+    Server-Sent Events stream of state transitions for the given tasks.
+    Ends once every task reached a terminal state or the stream timed out,
+    or with an `error` event when the result backend can't be read.
+    """
+    pending = set(task_ids)
+    last_state: dict[str, str] = {}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.TASK_EVENTS_STREAM_TIMEOUT_SECONDS
+
+    # Subscribe before the snapshot so no transition falls in between
+    queue = hub.subscribe(pending)
+    try:
+        async def snapshot() -> AsyncIterator[str]:
+            statuses = await task_status.get_task_statuses(list(pending))
+            for task_id, status in statuses.items():
+                if last_state.get(task_id) != status["status"]:
+                    last_state[task_id] = status["status"]
+                    yield format_sse("status", status)
+                if status["status"] in task_status.READY_STATES:
+                    pending.discard(task_id)
+
+        async for chunk in snapshot():
+            yield chunk
+
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=min(settings.TASK_EVENTS_KEEPALIVE_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                # Re-check in case an event was dropped or published during a reconnect
+                async for chunk in snapshot():
+                    yield chunk
+                continue
+
+            task_id = event["task_id"]
+            if task_id not in pending or last_state.get(task_id) == event["status"]:
+                continue
+            last_state[task_id] = event["status"]
+            if event["status"] in task_status.READY_STATES:
+                # Full result (or error) comes from the backend, and is cached from then on
+                pending.discard(task_id)
+                status = await task_status.get_task_status(task_id)
+                yield format_sse("status", {**status, "status": event["status"]})
+            else:
+                yield format_sse("status", {
+                    "task_id": task_id, "status": event["status"], "result": None, "error": None, "date_done": None,
+                })
+
+        yield format_sse("end", {"pending": sorted(pending)})
+    except redis_client.RedisError as e:
+        logger.warning("Task status read failed: {}", e)
+        yield format_sse("error", {"detail": "Task status unavailable", "pending": sorted(pending)})
+    finally:
+        hub.unsubscribe(task_ids, queue)
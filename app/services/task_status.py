@@ -0,0 +1,95 @@
+import json
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.services.redis_client import get_redis
+
+# Key layout of Celery's Redis result backend
+RESULT_KEY_PREFIX = "celery-task-meta-"
+
+# States after which a task result never changes again
+READY_STATES = frozenset({"SUCCESS", "FAILURE", "REVOKED"})
+
+
+class TerminalStateCache:
+    """Bounded LRU of finished task results, so repeat polls skip Redis"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    def get(self, task_id: str) -> Optional[dict[str, Any]]:
+        item = self._data.get(task_id)
+        if item is not None:
+            self._data.move_to_end(task_id)
+        return item
+
+    def put(self, task_id: str, status: dict[str, Any]) -> None:
+        self._data[task_id] = status
+        self._data.move_to_end(task_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+terminal_cache = TerminalStateCache(settings.TASK_STATUS_CACHE_SIZE)
+
+
+def parse_task_meta(task_id: str, raw: Optional[str]) -> dict[str, Any]:
+    """Turn a raw result-backend value into the API status shape"""
+    if raw is None:
+        # Celery reports unknown ids as PENDING as well
+        return {"task_id": task_id, "status": "PENDING", "result": None, "error": None, "date_done": None}
+
+    meta = json.loads(raw)
+    state = meta.get("status", "PENDING")
+    result = meta.get("result")
+    error = None
+    if state == "FAILURE" and isinstance(result, dict):
+        error = f"{result.get('exc_type', 'Exception')}: {result.get('exc_message')}"
+        result = None
+
+    return {
+        "task_id": task_id,
+        "status": state,
+        "result": result if state == "SUCCESS" else None,
+        "error": error,
+        "date_done": meta.get("date_done"),
+    }
+
+
+async def get_task_statuses(task_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """
+    Look up many tasks at once.
+    Finished tasks are served from the in-process cache; the rest are
+    fetched with a single MGET round trip.
+    """
+    statuses: dict[str, dict[str, Any]] = {}
+    missing: list[str] = []
+    for task_id in dict.fromkeys(task_ids):
+        cached = terminal_cache.get(task_id)
+        if cached is not None:
+            statuses[task_id] = cached
+        else:
+            missing.append(task_id)
+
+    if missing:
+        raws = await get_redis().mget([RESULT_KEY_PREFIX + task_id for task_id in missing])
+        for task_id, raw in zip(missing, raws):
+            status = parse_task_meta(task_id, raw)
+            if status["status"] in READY_STATES:
+                terminal_cache.put(task_id, status)
+            statuses[task_id] = status
+
+    return statuses
+
+
+async def get_task_status(task_id: str) -> dict[str, Any]:
+    """Look up a single task"""
+    return (await get_task_statuses([task_id]))[task_id]
@@ -0,0 +1,275 @@
+import asyncio
+import hashlib
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.services import redis_client
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. `in` never misses an added item and
+    wrongly reports an absent one with probability about `error_rate` while
+    no more than `capacity` items have been added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+INLINE_ADD_LIMIT = 1_000  # larger sync batches are added to the filter from a thread
+
+
+def build_filter(items: list[str], capacity: int, error_rate: float) -> BloomFilter:
+    bloom = BloomFilter(capacity, error_rate)
+    for item in items:
+        bloom.add(item)
+    return bloom
+
+
+class RevocationStore(ABC):
+    """
+    Authoritative state: refresh tokens already used (single use) and
+    revoked sessions, each kept until its tokens would expire anyway.
+    """
+
+    @abstractmethod
+    async def claim(self, token_id: str, expires_at: float) -> bool:
+        """Mark a refresh token used. Returns False if it already was (reuse)."""
+
+    @abstractmethod
+    async def revoke(self, family: str, expires_at: float) -> None:
+        """Revoke a session family"""
+
+    @abstractmethod
+    async def contains(self, family: str) -> bool:
+        """Whether a session family is currently revoked"""
+
+    @abstractmethod
+    async def changes(self, cursor: Optional[str]) -> tuple[list[str], str]:
+        """
+        Families revoked after `cursor`, and the cursor to continue from.
+        Without a cursor: every family that may still be revoked.
+        """
+
+
+class MemoryRevocationStore(RevocationStore):
+    """Per-process store; only correct with a single worker"""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._claims: dict[str, float] = {}
+        self._prune_claims_at = 1024
+        self._families: dict[str, float] = {}
+        self._log: list[str] = []
+
+    async def claim(self, token_id: str, expires_at: float) -> bool:
+        now = self.clock()
+        if self._claims.get(token_id, 0) > now:
+            return False
+        self._claims[token_id] = expires_at
+        if len(self._claims) > self._prune_claims_at:
+            self._claims = {jti: exp for jti, exp in self._claims.items() if exp > now}
+            self._prune_claims_at = max(1024, 2 * len(self._claims))
+        return True
+
+    async def revoke(self, family: str, expires_at: float) -> None:
+        self._families[family] = expires_at
+        self._log.append(family)
+
+    async def contains(self, family: str) -> bool:
+        return self._families.get(family, 0) > self.clock()
+
+    async def changes(self, cursor: Optional[str]) -> tuple[list[str], str]:
+        if cursor is None:
+            now = self.clock()
+            self._families = {family: exp for family, exp in self._families.items() if exp > now}
+            return list(self._families), str(len(self._log))
+        return self._log[int(cursor):], str(len(self._log))
+
+
+class RedisRevocationStore(RevocationStore):
+    """
+    Shared by all workers:
+    - used-refresh-token:<jti> keys, set with NX and expiring with the token,
+      make single use one atomic write;
+    - revoked-session:<fam> keys answer `contains`;
+    - the revoked-sessions stream lets workers fetch only new revocations.
+      Entry ids are assigned by Redis, so no entry is skipped whatever the
+      workers' clocks say. Entries older than `retention` are trimmed.
+    """
+
+    claim_prefix = "used-refresh-token:"
+    session_prefix = "revoked-session:"
+    log_key = "revoked-sessions"
+    page_size = 10_000
+
+    def __init__(self, retention: float):
+        self.retention = retention
+
+    async def claim(self, token_id: str, expires_at: float) -> bool:
+        redis = redis_client.get_redis()
+        return bool(await redis.set(self.claim_prefix + token_id, 1, nx=True, exat=math.ceil(expires_at)))
+
+    async def revoke(self, family: str, expires_at: float) -> None:
+        oldest_ms = int((time.time() - self.retention) * 1000)
+        async with redis_client.get_redis().pipeline(transaction=True) as pipe:
+            pipe.set(self.session_prefix + family, 1, exat=math.ceil(expires_at))
+            pipe.xadd(self.log_key, {"family": family}, minid=oldest_ms, approximate=True)
+            await pipe.execute()
+
+    async def contains(self, family: str) -> bool:
+        return bool(await redis_client.get_redis().exists(self.session_prefix + family))
+
+    async def changes(self, cursor: Optional[str]) -> tuple[list[str], str]:
+        redis = redis_client.get_redis()
+        families: list[str] = []
+        start = "-" if cursor is None else f"({cursor}"
+        while True:
+            entries = await redis.xrange(self.log_key, min=start, max="+", count=self.page_size)
+            for entry_id, fields in entries:
+                families.append(fields["family"])
+                cursor = entry_id
+            if len(entries) < self.page_size:
+                return families, cursor or "0-0"
+            start = f"({cursor}"
+
+
+class TokenRevocations:
+    """
+    Refresh-token single use and revoked sessions.
+
+    Claiming a refresh token goes straight to the store: one atomic write
+    per /auth/refresh, and used tokens never enter the filter. Revoked
+    session families, checked on every authenticated request, sit behind an
+    in-process Bloom filter. A filter miss means "not revoked" without any
+    I/O. A hit is confirmed against the store, since it may be a false
+    positive.
+
+    Every `sync_interval` the filter picks up only the families revoked
+    since the previous sync. Full rebuilds (the first sync, or the filter
+    reaching its capacity) are built in a thread, off the event loop.
+    Revocations made by this process enter the filter immediately; ones
+    made by other workers arrive at the next sync.
+    """
+
+    def __init__(self, store: RevocationStore, sync_interval: float, capacity: int, error_rate: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.store = store
+        self.sync_interval = sync_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.clock = clock
+        self.filter = BloomFilter(capacity, error_rate)
+        self.filter_capacity = capacity
+        self.cursor: Optional[str] = None
+        self.synced_at: Optional[float] = None
+        self.filter_hits = self.filter_misses = 0
+        self._sync_task: Optional[asyncio.Task] = None
+        self._revoked_during_sync: Optional[list[str]] = None
+
+    async def sync(self) -> None:
+        """Bring the filter up to date with the store"""
+        self._revoked_during_sync = []
+        try:
+            if self.cursor is None or self.filter.count >= self.filter_capacity:
+                families, cursor = await self.store.changes(None)
+                capacity = max(self.capacity, 2 * len(families))
+                self.filter = await asyncio.to_thread(build_filter, families, capacity, self.error_rate)
+                self.filter_capacity = capacity
+                # Revoked here while the new filter was being built
+                for family in self._revoked_during_sync:
+                    self.filter.add(family)
+            else:
+                families, cursor = await self.store.changes(self.cursor)
+                if len(families) > INLINE_ADD_LIMIT:
+                    await asyncio.to_thread(self._add_all, families)
+                else:
+                    self._add_all(families)
+            self.cursor = cursor
+        except redis_client.RedisError as e:
+            # Keep the current filter; local revocations are still in it
+            logger.warning("Token revocation sync failed: {}", e)
+        finally:
+            self._revoked_during_sync = None
+            self.synced_at = self.clock()
+
+    def _add_all(self, families: list[str]) -> None:
+        for family in families:
+            self.filter.add(family)
+
+    async def _ensure_fresh(self) -> None:
+        if self.synced_at is None:
+            await self.sync()
+        elif self.clock() - self.synced_at >= self.sync_interval and (self._sync_task is None or self._sync_task.done()):
+            # Refresh in the background; this request uses the current filter
+            self._sync_task = asyncio.create_task(self.sync(), name="token-revocation-sync")
+
+    async def claim(self, token_id: str, expires_at: float) -> bool:
+        """Use up a refresh token. Returns False if it was used before, i.e. it leaked."""
+        return await self.store.claim(token_id, expires_at)
+
+    async def is_revoked(self, family: str) -> bool:
+        await self._ensure_fresh()
+        if family not in self.filter:
+            self.filter_misses += 1
+            return False
+        self.filter_hits += 1
+        return await self.store.contains(family)
+
+    async def revoke(self, family: str, expires_at: float) -> None:
+        """Revoke a session family until `expires_at` (epoch seconds)"""
+        await self.store.revoke(family, expires_at)
+        self.filter.add(family)
+        if self._revoked_during_sync is not None:
+            self._revoked_during_sync.append(family)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "filter_items": self.filter.count,
+            "filter_bytes": len(self.filter.bits),
+            "filter_hits": self.filter_hits,
+            "filter_misses": self.filter_misses,
+        }
+
+
+_revocations: Optional[TokenRevocations] = None
+
+
+def get_revocations() -> TokenRevocations:
+    global _revocations
+    if _revocations is None:
+        if settings.TOKEN_REVOCATION_BACKEND == "redis":
+            store: RevocationStore = RedisRevocationStore(retention=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+        else:
+            store = MemoryRevocationStore()
+        _revocations = TokenRevocations(
+            store,
+            sync_interval=settings.TOKEN_REVOCATION_SYNC_SECONDS,
+            capacity=settings.TOKEN_REVOCATION_FILTER_CAPACITY,
+            error_rate=settings.TOKEN_REVOCATION_FILTER_ERROR_RATE,
+        )
+    return _revocations
@@ -0,0 +1,72 @@
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.context import request_id_var
+from app.core.tracing import TRACEPARENT_HEADER, tracer
+
+MAX_STATEMENT_LENGTH = 1000
+
+
+async def trace_requests(request: Request, call_next):
+    """HTTP middleware; only registered when TRACING_ENABLED is set"""
+    span = tracer.start_span(f"{request.method} {request.url.path}", "server", request.headers.get(TRACEPARENT_HEADER))
+    token = tracer.activate(span)
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        tracer.end_span(span, e)
+        raise
+    finally:
+        tracer.deactivate(token)
+
+    route = getattr(request.scope.get("route"), "path", None)
+    if route is not None:
+        span.name = f"{request.method} {route}"
+    span.set_attribute("http.method", request.method)
+    span.set_attribute("http.route", route)
+    span.set_attribute("http.status_code", response.status_code)
+    span.set_attribute("request_id", request_id_var.get())
+    if response.status_code >= 500:
+        span.status = "error"
+    tracer.end_span(span)
+    response.headers[TRACEPARENT_HEADER] = span.traceparent
+    return response
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    One span per SQL statement executed inside a traced request or task.
+    Statements outside a trace (pool pre-ping, migrations) are not traced.
+    """
+    sync_engine = engine.sync_engine
+    system = sync_engine.dialect.name
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        parent = tracer.current_span()
+        if parent is None or not parent.sampled or context is None:
+            return
+        span = tracer.start_span(statement.split(None, 1)[0].upper() if statement else "SQL", "client", parent=parent)
+        span.set_attribute("db.system", system)
+        span.set_attribute("db.statement", statement[:MAX_STATEMENT_LENGTH])
+        if executemany:
+            span.set_attribute("db.executemany", True)
+        context._trace_span = span
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            context._trace_span = None
+            if cursor is not None and cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.rowcount", cursor.rowcount)
+            tracer.end_span(span)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        context = exception_context.execution_context
+        span = getattr(context, "_trace_span", None) if context is not None else None
+        if span is not None:
+            context._trace_span = None
+            tracer.end_span(span, exception_context.original_exception)
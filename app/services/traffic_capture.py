@@ -0,0 +1,82 @@
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from fastapi import Request
+
+from app.core.config import settings
+
+
+def body_size(request: Request) -> int:
+    """Declared body size; 0 when Content-Length is missing or malformed"""
+    try:
+        return max(0, int(request.headers.get("content-length") or 0))
+    except ValueError:
+        return 0
+
+
+class TrafficRecorder:
+    """
+    Buffers sampled request metadata and appends it to an NDJSON file.
+    Only the shape of a request is kept (route template, query keys, body size,
+    whether it was authenticated), never values, headers or bodies.
+
+    Record keys: t=epoch ms, m=method, r=route template, q=query keys,
+    b=body bytes, a=authenticated (0/1), s=status, d=duration ms.
+    """
+
+    def __init__(self, path: str, sample_rate: float, flush_every: int):
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self.flush_every = flush_every
+        self._buffer: list[str] = []
+        self._pending: Optional[asyncio.Task] = None
+
+    def sampled(self) -> bool:
+        return random.random() < self.sample_rate
+
+    def record(self, request: Request, status_code: int, duration: float) -> None:
+        route = request.scope.get("route")
+        entry: dict[str, Any] = {
+            "t": int(time.time() * 1000),
+            "m": request.method,
+            "r": getattr(route, "path", None) or "<unmatched>",
+            "q": sorted(request.query_params.keys()),
+            "b": body_size(request),
+            "a": int("authorization" in request.headers),
+            "s": status_code,
+            "d": round(duration * 1000, 2),
+        }
+        self._buffer.append(json.dumps(entry, separators=(",", ":")))
+        if len(self._buffer) >= self.flush_every and (self._pending is None or self._pending.done()):
+            self._pending = asyncio.create_task(self.flush())
+
+    def _write(self, lines: list[str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    async def flush(self) -> None:
+        """Append buffered records off the event loop"""
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._write, lines)
+
+
+recorder = TrafficRecorder(
+    settings.TRAFFIC_CAPTURE_PATH, settings.TRAFFIC_CAPTURE_SAMPLE_RATE, settings.TRAFFIC_CAPTURE_FLUSH_EVERY
+)
+
+
+async def capture_traffic(request: Request, call_next):
+    """HTTP middleware; only registered when TRAFFIC_CAPTURE_ENABLED is set"""
+    if not recorder.sampled():
+        return await call_next(request)
+    started = time.perf_counter()
+    response = await call_next(request)
+    recorder.record(request, response.status_code, time.perf_counter() - started)
+    return response
@@ -0,0 +1,50 @@
+import json
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+import redis
+from celery.signals import task_postrun, task_prerun, task_revoked
+
+# Must match settings.TASK_EVENTS_CHANNEL on the API side
+TASK_EVENTS_CHANNEL = os.getenv("TASK_EVENTS_CHANNEL", "task-events")
+
+_client: Optional[redis.Redis] = None
+
+
+def _get_client() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://redis:6379/0"))
+    return _client
+
+
+def publish_state(task_id: Optional[str], state: Optional[str]) -> None:
+    """Publish a task state transition; never fails the task itself"""
+    if not task_id or not state:
+        return
+    event = {
+        "task_id": task_id,
+        "status": state,
+        "date": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        _get_client().publish(TASK_EVENTS_CHANNEL, json.dumps(event))
+    except redis.RedisError as e:
+        print(f"[worker] Unable to publish task event for {task_id}: {e}")
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id=None, **kwargs):
+    publish_state(task_id, "STARTED")
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id=None, state=None, **kwargs):
+    # Fired after the result is stored, so listeners can fetch it right away
+    publish_state(task_id, state)
+
+
+@task_revoked.connect
+def _on_task_revoked(request=None, **kwargs):
+    publish_state(getattr(request, "id", None), "REVOKED")
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values: int) -> str:
+    """Compact, URL-safe cursor from non-negative integers, e.g. '63f1a2b4c5d6e.1f4'"""
+    return ".".join(format(value, "x") for value in values)
+
+
+def decode_cursor(cursor: str, size: int) -> tuple[int, ...]:
+    parts = cursor.split(".")
+    if len(parts) != size:
+        raise InvalidCursor(cursor)
+    try:
+        values = tuple(int(part, 16) for part in parts)
+    except ValueError:
+        raise InvalidCursor(cursor) from None
+    if any(value < 0 for value in values):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes (e.g. from SQLite) as UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def datetime_to_micros(value: datetime) -> int:
+    return (as_utc(value) - EPOCH) // timedelta(microseconds=1)
+
+
+def micros_to_datetime(value: int) -> datetime:
+    try:
+        return EPOCH + timedelta(microseconds=value)
+    except OverflowError:
+        # Past datetime.max: can't have come from encode_cursor
+        raise InvalidCursor(value) from None
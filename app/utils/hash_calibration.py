@@ -0,0 +1,104 @@
+"""
+Pick password-hash costs from measurements on this host.
+
+Login latency is dominated by one hash verification, so costs are chosen
+as the highest ones whose verify time stays within a target (250 ms by
+default). Run it on the hardware that serves logins: `python -m app
+calibrate-hash`.
+"""
+import math
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+SAMPLE_PASSWORD = "calibration-Password-123"
+
+BCRYPT_MIN_ROUNDS = 10  # never recommend less, whatever the target
+BCRYPT_MAX_ROUNDS = 20
+BCRYPT_PROBE_ROUNDS = 8
+ARGON2_MIN_MEMORY_KIB = 19 * 1024  # OWASP minimum for argon2id
+ARGON2_MAX_TIME_COST = 10
+
+
+def measure_verify(hasher, samples: int = 3) -> float:
+    """Median seconds to verify a password against a hash made by `hasher`"""
+    hashed = hasher.hash(SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.verify(SAMPLE_PASSWORD, hashed)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt(target_ms: float, measure: Callable[[Any, int], float] = measure_verify) -> dict[str, Any]:
+    """
+    bcrypt work doubles with each round, so one cheap probe predicts every
+    cost; the prediction is then checked with a real measurement.
+    """
+    from passlib.hash import bcrypt
+
+    target = target_ms / 1000
+    probe = measure(bcrypt.using(rounds=BCRYPT_PROBE_ROUNDS), 5)
+    rounds = BCRYPT_PROBE_ROUNDS + math.floor(math.log2(target / probe))
+    rounds = min(BCRYPT_MAX_ROUNDS, max(BCRYPT_MIN_ROUNDS, rounds))
+
+    measured = measure(bcrypt.using(rounds=rounds), 1)
+    while measured > target and rounds > BCRYPT_MIN_ROUNDS:
+        rounds -= 1
+        measured = measure(bcrypt.using(rounds=rounds), 1)
+    return {
+        "scheme": "bcrypt",
+        "target_ms": target_ms,
+        "verify_ms": round(measured * 1000, 1),
+        "settings": {"PASSWORD_HASH_SCHEME": "bcrypt", "BCRYPT_ROUNDS": rounds},
+    }
+
+
+def calibrate_argon2(target_ms: float, memory_kib: int, parallelism: int,
+                     measure: Callable[[Any, int], float] = measure_verify) -> dict[str, Any]:
+    """
+    Memory cost is what makes argon2 expensive to attack, so it is kept
+    (halved only while a single pass is already over the target) and the
+    time cost fills the remaining budget.
+    """
+    from passlib.hash import argon2
+
+    def hasher(time_cost: int):
+        return argon2.using(rounds=time_cost, memory_cost=memory_kib, parallelism=parallelism)
+
+    target = target_ms / 1000
+    single_pass = measure(hasher(1), 3)
+    while single_pass > target and memory_kib > ARGON2_MIN_MEMORY_KIB:
+        memory_kib = max(ARGON2_MIN_MEMORY_KIB, memory_kib // 2)
+        single_pass = measure(hasher(1), 3)
+
+    time_cost = min(ARGON2_MAX_TIME_COST, max(1, math.floor(target / single_pass)))
+    measured = measure(hasher(time_cost), 1)
+    while measured > target and time_cost > 1:
+        time_cost -= 1
+        measured = measure(hasher(time_cost), 1)
+    return {
+        "scheme": "argon2",
+        "target_ms": target_ms,
+        "verify_ms": round(measured * 1000, 1),
+        "settings": {
+            "PASSWORD_HASH_SCHEME": "argon2",
+            "ARGON2_TIME_COST": time_cost,
+            "ARGON2_MEMORY_COST_KIB": memory_kib,
+            "ARGON2_PARALLELISM": parallelism,
+        },
+    }
+
+
+def update_env_file(path: Path, values: dict[str, Any]) -> None:
+    """Set `KEY=value` lines in an env file, replacing existing ones and appending the rest"""
+    lines = path.read_text().splitlines() if path.exists() else []
+    pending = {key: str(value) for key, value in values.items()}
+    for i, line in enumerate(lines):
+        key = line.split("=", 1)[0].strip()
+        if "=" in line and key in pending:
+            lines[i] = f"{key}={pending.pop(key)}"
+    lines += [f"{key}={value}" for key, value in pending.items()]
+    path.write_text("\n".join(lines) + "\n")
@@ -0,0 +1,94 @@
+"""
+Cold-start profiler.
+
+    python -m app.utils.startup_profile            # import-time report + time to first request
+    python -m app.utils.startup_profile --json     # machine-readable (used by the budget test)
+
+Every measurement runs in a fresh interpreter so module caches don't hide import cost.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from typing import Any
+
+# Heavy dependencies that must not be imported just by importing the app
+LAZY_MODULES = ("passlib", "bcrypt", "jose", "celery", "kombu", "alembic", "redis")
+
+_FIRST_REQUEST_SNIPPET = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from httpx import ASGITransport, AsyncClient
+
+async def first_request():
+    transport = ASGITransport(app=app.main.app)
+    async with AsyncClient(transport=transport, base_url="http://startup") as client:
+        return (await client.get("/")).status_code
+
+status_code = asyncio.run(first_request())
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": round((imported - started) * 1000, 1),
+    "first_request_ms": round((done - imported) * 1000, 1),
+    "time_to_first_request_ms": round((done - started) * 1000, 1),
+    "status_code": status_code,
+    "eager_heavy_modules": sorted(
+        m for m in %r if m in sys.modules
+    ),
+}))
+"""
+
+
+def importtime_report(module: str = "app.main", top: int = 20) -> list[dict[str, Any]]:
+    """Top modules by cumulative import time (microseconds), from `python -X importtime`"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not self_us.isdigit():
+            continue  # header line
+        rows.append({"module": name, "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    rows.sort(key=lambda row: row["cumulative_us"], reverse=True)
+    return rows[:top]
+
+
+def measure_first_request() -> dict[str, Any]:
+    """Import the app and serve one request in a fresh interpreter"""
+    proc = subprocess.run(
+        [sys.executable, "-c", _FIRST_REQUEST_SNIPPET % (LAZY_MODULES,)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile application cold start")
+    parser.add_argument("--top", type=int, default=20, help="number of modules in the import report")
+    parser.add_argument("--json", action="store_true", help="print a JSON document instead of a table")
+    args = parser.parse_args()
+
+    report = {"first_request": measure_first_request(), "imports": importtime_report(top=args.top)}
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    first = report["first_request"]
+    print(f"import app.main:        {first['import_ms']:>8.1f} ms")
+    print(f"first request:          {first['first_request_ms']:>8.1f} ms")
+    print(f"time to first request:  {first['time_to_first_request_ms']:>8.1f} ms")
+    print(f"eager heavy modules:    {', '.join(first['eager_heavy_modules']) or 'none'}")
+    print()
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for row in report["imports"]:
+        print(f"{row['cumulative_us'] / 1000:>14.1f} {row['self_us'] / 1000:>9.1f}  {row['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from typing import Optional
+
+
+class Ewma:
+    """Exponentially weighted moving average"""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.value: float = 0.0
+        self._initialized = False
+
+    def update(self, sample: float) -> float:
+        if not self._initialized:
+            self.value = sample
+            self._initialized = True
+        else:
+            self.value += self.alpha * (sample - self.value)
+        return self.value
+
+
+class WindowStats:
+    """Count / mean / max of samples since the last snapshot"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, sample: float) -> None:
+        self.count += 1
+        self.total += sample
+        if sample > self.max:
+            self.max = sample
+
+    def snapshot(self) -> tuple[int, Optional[float], float]:
+        """Return (count, mean or None, max) and start a new window"""
+        count, total, peak = self.count, self.total, self.max
+        self.count, self.total, self.max = 0, 0.0, 0.0
+        return count, (total / count if count else None), peak
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def latency_summary(latencies: list[float], elapsed: float) -> dict[str, float]:
+    """Throughput and latency percentiles (ms) for a run of `elapsed` seconds"""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "rps": round(len(ordered) / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 2),
+    }
@@ -0,0 +1,15 @@
+from uvicorn.workers import UvicornWorker
+
+from app import server
+from app.core.config import settings
+
+
+class TunedUvicornWorker(UvicornWorker):
+    """Gunicorn worker running uvicorn with uvloop/httptools when installed"""
+
+    CONFIG_KWARGS = {
+        **UvicornWorker.CONFIG_KWARGS,
+        "loop": server.event_loop_impl(),
+        "http": server.http_impl(),
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE_SECONDS,
+    }
@@ -0,0 +1,202 @@
+"""
+In-process API latency benchmark.
+
+    python -m benchmarks.api_latency                      # run and print a table
+    python -m benchmarks.api_latency --update-baseline    # store results as the baseline
+    python -m benchmarks.api_latency --check              # fail if the baseline regressed
+
+The app is driven through httpx.ASGITransport (no sockets) against a throwaway
+SQLite database, with Celery publishing to its in-memory broker. Numbers are
+comparable between runs on the same machine, not with production.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from app.utils.stats import latency_summary
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+SEED_USERS = 500
+PASSWORD = "benchmark-password"
+
+
+def configure_environment(db_path: str) -> None:
+    """Point Settings at the local stand-ins; must run before the app is imported"""
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ["SYNC_DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+    os.environ["RUN_MIGRATIONS_ON_STARTUP"] = "false"
+    # The login scenario would otherwise hit its own rate limit
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+
+@dataclass
+class Scenario:
+    name: str
+    iterations: int
+    request: Callable[[Any, int], Awaitable[Any]]
+    expected_status: int = 200
+
+
+async def seed(session_factory, base_metadata, engine) -> None:
+    from sqlalchemy import insert
+    from app.models.user import User
+    from app.services.security import hash_password
+
+    async with engine.begin() as conn:
+        await conn.run_sync(base_metadata.drop_all)
+        await conn.run_sync(base_metadata.create_all)
+
+    hashed = hash_password(PASSWORD)  # one bcrypt hash shared by all seeded users
+    rows = [
+        {"email": f"user{i}@example.com", "username": f"user{i}", "hashed_password": hashed, "is_active": True}
+        for i in range(SEED_USERS)
+    ]
+    async with session_factory() as session:
+        await session.execute(insert(User), rows)
+        await session.commit()
+
+
+def build_scenarios(iterations: int, token: str) -> list[Scenario]:
+    counter = itertools.count()
+    auth = {"Authorization": f"Bearer {token}"}
+    # bcrypt dominates login and user creation, so they get fewer iterations
+    slow = max(1, iterations // 10)
+
+    scenarios = [
+        Scenario("auth_login", slow, lambda c, i: c.post(
+            "/api/v1/auth/login", json={"email": f"user{i % SEED_USERS}@example.com", "password": PASSWORD}
+        )),
+        Scenario("auth_me", iterations, lambda c, i: c.get("/api/v1/auth/me", headers=auth)),
+    ]
+    for page_size in (10, 50, 200):
+        scenarios.append(Scenario(
+            f"list_users_{page_size}", iterations,
+            lambda c, i, n=page_size: c.get(f"/api/v1/users/users?limit={n}&offset={(i * n) % SEED_USERS}"),
+        ))
+    scenarios += [
+        Scenario("create_user", slow, lambda c, i: c.post("/api/v1/users/users", json={
+            "email": f"new{next(counter)}@example.com", "username": f"new{next(counter)}", "password": PASSWORD,
+        }), expected_status=201),
+        Scenario("send_email", iterations, lambda c, i: c.post(
+            "/api/v1/tasks/send-email", json={"to": "x@example.com", "subject": "hi", "body": "bench"}
+        )),
+    ]
+    return scenarios
+
+
+async def run_scenario(client, scenario: Scenario, concurrency: int) -> dict[str, Any]:
+    latencies: list[float] = []
+    failures = 0
+    indexes = iter(range(scenario.iterations))
+
+    async def worker() -> None:
+        nonlocal failures
+        for i in indexes:
+            started = time.perf_counter()
+            response = await scenario.request(client, i)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != scenario.expected_status:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {**latency_summary(latencies, time.perf_counter() - started), "failures": failures}
+
+
+async def run(iterations: int, concurrency: int, only: set[str]) -> dict[str, dict[str, Any]]:
+    from httpx import ASGITransport, AsyncClient
+
+    from app.db.session import AsyncSessionLocal, engine
+    from app.main import app
+    from app.models.base import Base
+    from app.services import jwt_service
+    from app.tasks.worker import celery_app
+
+    # Publish to kombu's in-memory transport; nothing consumes or stores results
+    celery_app.conf.update(broker_url="memory://", result_backend="cache+memory://")
+
+    await seed(AsyncSessionLocal, Base.metadata, engine)
+    token = jwt_service.create_access_token({"sub": "1"})
+
+    results = {}
+    async with AsyncClient(transport=ASGITransport(app=app, raise_app_exceptions=False), base_url="http://bench") as client:
+        for scenario in build_scenarios(iterations, token):
+            if only and scenario.name not in only:
+                continue
+            await scenario.request(client, 0)  # warm-up (imports, statement cache)
+            results[scenario.name] = await run_scenario(client, scenario, concurrency)
+    await engine.dispose()
+    return results
+
+
+def compare(results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]], threshold: float) -> list[str]:
+    """Regressions beyond `threshold` (fractional) in throughput or p95 latency"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if current["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {current['rps']} < baseline {base['rps']}")
+        if current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms > baseline {base['p95_ms']} ms")
+        if current["failures"]:
+            regressions.append(f"{name}: {current['failures']} failed requests")
+    return regressions
+
+
+def print_table(results: dict[str, dict[str, Any]]) -> None:
+    print(f"{'scenario':<16} {'reqs':>6} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'fail':>5}")
+    for name, r in results.items():
+        print(
+            f"{name:<16} {r['requests']:>6} {r['rps']:>9.1f} {r['p50_ms']:>8.2f} "
+            f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['failures']:>5}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500, help="requests per fast scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--scenario", action="append", default=[], help="run only these scenarios")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="write results to --baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if results regress past --threshold")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression (0.25 = 25%%)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_environment(os.path.join(tmp, "bench.db"))
+        results = asyncio.run(run(args.iterations, args.concurrency, set(args.scenario)))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+    if args.check:
+        if not args.baseline.exists():
+            print(f"no baseline at {args.baseline}; run with --update-baseline first", file=sys.stderr)
+            return 1
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
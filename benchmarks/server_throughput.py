@@ -0,0 +1,107 @@
+"""
+Throughput of `python -m app serve` versus the default uvicorn invocation.
+
+    python -m benchmarks.server_throughput --requests 5000 --concurrency 64
+
+Both servers are started as subprocesses on local ports and driven over real
+sockets with keep-alive connections. The default path is "/", which does not
+touch the database, so the numbers compare the server stack only.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any
+
+import httpx
+
+from app.utils.stats import latency_summary
+
+CONFIGS = {
+    # What the Dockerfile used to run: a single uvicorn process
+    "default": [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", "{port}"],
+    "tuned": [sys.executable, "-m", "app", "serve", "--host", "127.0.0.1", "--port", "{port}"],
+}
+
+
+async def wait_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not become ready")
+
+
+async def drive(url: str, requests: int, concurrency: int) -> dict[str, Any]:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        async def worker() -> None:
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {**latency_summary(latencies, elapsed), "errors": errors}
+
+
+def run_config(name: str, port: int, path: str, requests: int, concurrency: int) -> dict[str, Any]:
+    command = [part.format(port=port) for part in CONFIGS[name]]
+    env = {**os.environ, "RUN_MIGRATIONS_ON_STARTUP": "false"}
+    proc = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        url = f"http://127.0.0.1:{port}{path}"
+        asyncio.run(wait_ready(url))
+        asyncio.run(drive(url, min(200, requests), concurrency))  # warm-up
+        return asyncio.run(drive(url, requests, concurrency))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = {
+        name: run_config(name, args.port + offset, args.path, args.requests, args.concurrency)
+        for offset, name in enumerate(CONFIGS)
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'config':<10} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['rps']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['errors']:>7}")
+    print(f"speedup: {results['tuned']['rps'] / max(results['default']['rps'], 1e-9):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Replay captured traffic (TRAFFIC_CAPTURE_ENABLED=true) against a running instance.
+
+    python -m benchmarks.traffic_replay logs/traffic.ndjson \\
+        --base-url http://localhost:8000 --rate 5 --concurrency 50 --token <jwt>
+
+The capture keeps only request shapes, so concrete values are synthesized:
+path parameters come from --param (e.g. --param user_id=1-500), query keys get
+sensible defaults and known POST routes get generated bodies. Inter-arrival
+times are preserved and divided by --rate.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import re
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import httpx
+
+from app.utils.stats import latency_summary
+
+QUERY_DEFAULTS = {"limit": "50", "offset": "0"}
+_PARAM = re.compile(r"{(\w+)(?::\w+)?}")
+_counter = itertools.count()
+
+
+def _unique() -> str:
+    return f"{int(time.time())}{next(_counter)}"
+
+
+# Generated bodies for routes whose payload the capture cannot reproduce
+BODY_FACTORIES: dict[tuple[str, str], Callable[[argparse.Namespace], dict[str, Any]]] = {
+    ("POST", "/api/v1/users/users"): lambda args: {
+        "email": f"replay{(n := _unique())}@example.com", "username": f"replay{n}", "password": "replay-password",
+    },
+    ("POST", "/api/v1/auth/login"): lambda args: {"email": args.login_email, "password": args.login_password},
+    ("POST", "/api/v1/tasks/send-email"): lambda args: {"to": "replay@example.com", "subject": "replay", "body": "replay"},
+    ("POST", "/api/v1/tasks/status"): lambda args: {"task_ids": [str(uuid.uuid4())]},
+}
+
+
+def load_capture(path: Path) -> list[dict[str, Any]]:
+    records = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    records.sort(key=lambda r: r["t"])
+    return [r for r in records if r["r"] != "<unmatched>"]
+
+
+def parse_params(values: list[str]) -> dict[str, Callable[[], str]]:
+    """--param name=value or name=lo-hi (random integer in range)"""
+    params: dict[str, Callable[[], str]] = {}
+    for value in values:
+        name, _, spec = value.partition("=")
+        lo, sep, hi = spec.partition("-")
+        if sep and lo.isdigit() and hi.isdigit():
+            params[name] = lambda lo=int(lo), hi=int(hi): str(random.randint(lo, hi))
+        else:
+            params[name] = lambda spec=spec: spec
+    return params
+
+
+def build_request(record: dict[str, Any], args: argparse.Namespace, params: dict[str, Callable[[], str]]) -> dict[str, Any]:
+    def fill(match: re.Match) -> str:
+        name = match.group(1)
+        if name in params:
+            return params[name]()
+        return str(uuid.uuid4()) if name.endswith("task_id") else "1"
+
+    request: dict[str, Any] = {
+        "method": record["m"],
+        "url": _PARAM.sub(fill, record["r"]),
+        "params": {key: QUERY_DEFAULTS.get(key, "1") for key in record["q"]},
+        "headers": {},
+    }
+    if record["a"] and args.token:
+        request["headers"]["Authorization"] = f"Bearer {args.token}"
+    factory = BODY_FACTORIES.get((record["m"], record["r"]))
+    if factory is not None:
+        request["json"] = factory(args)
+    elif record["b"]:
+        request["json"] = {}
+    return request
+
+
+def schedule(records: list[dict[str, Any]], rate: float, loops: int) -> Iterator[tuple[float, dict[str, Any]]]:
+    """(offset seconds, record) pairs with inter-arrival gaps divided by `rate`"""
+    if not records:
+        return
+    span = (records[-1]["t"] - records[0]["t"]) / 1000 / rate
+    for loop in range(loops):
+        for record in records:
+            yield loop * span + (record["t"] - records[0]["t"]) / 1000 / rate, record
+
+
+async def replay(records: list[dict[str, Any]], args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    params = parse_params(args.param)
+    latencies: defaultdict[str, list[float]] = defaultdict(list)
+    statuses: defaultdict[str, Counter] = defaultdict(Counter)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    dropped = 0
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        async def send(record: dict[str, Any]) -> None:
+            key = f"{record['m']} {record['r']}"
+            try:
+                started = time.perf_counter()
+                response = await client.request(**build_request(record, args, params))
+                latencies[key].append(time.perf_counter() - started)
+                statuses[key][response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[key][type(e).__name__] += 1
+            finally:
+                semaphore.release()
+
+        tasks = []
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for offset, record in schedule(records, args.rate, args.loops):
+            delay = started + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if args.drop_when_saturated and semaphore.locked():
+                dropped += 1
+                continue
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(send(record)))
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - started
+
+    report = {
+        key: {**latency_summary(values, elapsed), "status": dict(statuses[key])}
+        for key, values in sorted(latencies.items())
+    }
+    for key in statuses.keys() - latencies.keys():
+        report[key] = {"requests": 0, "status": dict(statuses[key])}
+    if dropped:
+        report["_dropped"] = {"requests": dropped}
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", type=Path, help="NDJSON file written by the capture middleware")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--rate", type=float, default=1.0, help="speed-up factor for the captured arrival rate")
+    parser.add_argument("--loops", type=int, default=1, help="replay the capture this many times back to back")
+    parser.add_argument("--concurrency", type=int, default=50, help="max requests in flight")
+    parser.add_argument("--drop-when-saturated", action="store_true",
+                        help="skip requests instead of delaying them when --concurrency is reached")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--token", help="bearer token for requests captured as authenticated")
+    parser.add_argument("--login-email", default="replay@example.com")
+    parser.add_argument("--login-password", default="replay-password")
+    parser.add_argument("--param", action="append", default=[], help="path parameter, e.g. user_id=1-500")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    records = load_capture(args.capture)
+    if not records:
+        print(f"no replayable records in {args.capture}", file=sys.stderr)
+        return 1
+    report = asyncio.run(replay(records, args))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{'route':<45} {'reqs':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  status")
+    for key, r in report.items():
+        if key == "_dropped":
+            continue
+        print(f"{key:<45} {r['requests']:>6} {r.get('p50_ms', 0):>8.2f} {r.get('p95_ms', 0):>8.2f} "
+              f"{r.get('p99_ms', 0):>8.2f}  {r['status']}")
+    if "_dropped" in report:
+        print(f"dropped (saturated): {report['_dropped']['requests']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+User search latency on PostgreSQL at scale.
+
+    python -m benchmarks.user_search                    # 1M users, indexes from the migration
+    python -m benchmarks.user_search --rows 200000 --compare-scan --explain
+
+Users are generated with generate_series into a scratch schema
+(bench_user_search) on settings.DATABASE_URL, the search indexes are created
+from the a71e4c2f9d30 migration, and each query shape is timed through
+CRUDUser.search. --compare-scan repeats the run with index scans disabled;
+--explain prints each plan. The schema is dropped afterwards unless --keep.
+"""
+import argparse
+import asyncio
+import hashlib
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from app.utils.stats import latency_summary
+
+SCHEMA = "bench_user_search"
+MIGRATION = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "a71e4c2f9d30_add_user_search_indexes.py"
+
+SEED_SQL = f"""
+INSERT INTO {SCHEMA}.users (email, username, hashed_password, is_active)
+SELECT 'user' || g || '.' || substr(md5(g::text), 1, 8) || '@example.com',
+       substr(md5(g::text), 9, 10) || '_' || g,
+       'x', true
+FROM generate_series(1, :rows) AS g
+"""
+
+
+def scenarios(rows: int) -> dict[str, str]:
+    """Query strings per shape, derived from the generator above so they hit real rows"""
+    g = rows // 2
+    digest = hashlib.md5(str(g).encode()).hexdigest()
+    return {
+        "exact_email": f"user{g}.{digest[:8]}@example.com",
+        "prefix_short": "ab",  # below the trigram threshold: prefix only
+        "prefix_email": f"user{g // 10}",
+        "substring": digest[9:14],
+        "no_match": "zzzzqq",
+    }
+
+
+def search_indexes() -> dict[str, str]:
+    spec = importlib.util.spec_from_file_location("user_search_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.INDEXES
+
+
+async def setup(engine, rows: int) -> float:
+    from sqlalchemy import text
+    from app.models.user import User
+
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        # search_path puts the scratch schema first, so the model's table lands there
+        await conn.run_sync(lambda sync_conn: User.__table__.create(sync_conn))
+        await conn.execute(text(SEED_SQL), {"rows": rows})
+        for name, definition in search_indexes().items():
+            await conn.execute(text(f"CREATE INDEX {name} ON {SCHEMA}.users {definition}"))
+        await conn.execute(text(f"ANALYZE {SCHEMA}.users"))
+    return time.perf_counter() - started
+
+
+async def measure(engine, queries: dict[str, str], iterations: int, scan: bool, explain: bool) -> dict[str, Any]:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from app.crud import user as user_crud
+
+    results: dict[str, Any] = {}
+    async with engine.connect() as conn:
+        if scan:
+            await conn.execute(text("SET enable_indexscan = off"))
+            await conn.execute(text("SET enable_bitmapscan = off"))
+        session = AsyncSession(bind=conn)
+        for name, q in queries.items():
+            if explain:
+                query = user_crud.user.search_query(q=q, after=None, limit=21)
+                sql = str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+                plan = (await conn.execute(text("EXPLAIN " + sql))).scalars().all()
+                print(f"-- {name} ({'scan' if scan else 'indexed'})\n" + "\n".join(plan) + "\n")
+
+            latencies, hits = [], 0
+            started = time.perf_counter()
+            for _ in range(iterations):
+                t0 = time.perf_counter()
+                hits = len(await user_crud.user.search(session, q=q, after=None, limit=21))
+                latencies.append(time.perf_counter() - t0)
+            results[name] = {**latency_summary(latencies, time.perf_counter() - started), "hits": hits}
+        await session.close()
+    return results
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.core.config import settings
+
+    engine = create_async_engine(
+        args.database_url or settings.DATABASE_URL,
+        connect_args={"server_settings": {"search_path": f"{SCHEMA},public"}},
+    )
+    try:
+        report: dict[str, Any] = {"rows": args.rows}
+        if not args.reuse:
+            report["setup_s"] = round(await setup(engine, args.rows), 1)
+        queries = scenarios(args.rows)
+        report["indexed"] = await measure(engine, queries, args.iterations, scan=False, explain=args.explain)
+        if args.compare_scan:
+            report["scan"] = await measure(engine, queries, max(1, args.iterations // 10), scan=True, explain=args.explain)
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    finally:
+        await engine.dispose()
+    return report
+
+
+def print_table(report: dict[str, Any]) -> None:
+    print(f"rows: {report['rows']:,}" + (f"  (setup {report['setup_s']} s)" if "setup_s" in report else ""))
+    for mode in ("indexed", "scan"):
+        if mode not in report:
+            continue
+        print(f"\n{mode:<14} {'hits':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for name, r in report[mode].items():
+            print(f"{name:<14} {r['hits']:>5} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=50, help="searches per query shape")
+    parser.add_argument("--database-url", help="defaults to settings.DATABASE_URL (must be PostgreSQL)")
+    parser.add_argument("--compare-scan", action="store_true", help="also run with index scans disabled")
+    parser.add_argument("--explain", action="store_true", help="print the plan of each query shape")
+    parser.add_argument("--reuse", action="store_true", help="skip setup and reuse a schema left by --keep")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema for another run")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
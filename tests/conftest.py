@@ -2,7 +2,7 @@ import asyncio
 from typing import AsyncGenerator
 import pytest
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
@@ -48,3 +48,33 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield ac
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+async def sqlite_sessionmaker(tmp_path) -> AsyncGenerator[async_sessionmaker, None]:
+    """
+    Session factory over a throwaway SQLite database with all tables created,
+    for tests that need real queries but no Postgres.
+    """
+    pytest.importorskip("aiosqlite")
+    sqlite_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with sqlite_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield async_sessionmaker(sqlite_engine, expire_on_commit=False)
+
+    await sqlite_engine.dispose()
+
+
+@pytest.fixture(scope="function")
+async def sqlite_client(sqlite_sessionmaker: async_sessionmaker) -> AsyncGenerator[AsyncClient, None]:
+    """Test client whose get_session is backed by `sqlite_sessionmaker`."""
+    async def override_get_session():
+        async with sqlite_sessionmaker() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_get_session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+    app.dependency_overrides.clear()
@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+
+from app.services.admission import AdmissionController
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_controller(**overrides) -> AdmissionController:
+    options = dict(
+        max_limit=4, min_limit=1, reserved=1, route_limits={}, max_queue=2, max_wait=0.05,
+        pool_wait_target=0.05, loop_lag_target=0.05,
+    )
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+async def test_reserved_slots_only_go_to_priority_routes():
+    controller = make_controller()
+
+    assert all([await controller.acquire(None) for _ in range(3)])
+    assert await controller.acquire(None) is False  # waited, then shed
+    assert await controller.acquire(None, priority=True) is True
+    assert controller.shed_count == 1
+
+
+async def test_queue_depth_sheds_immediately():
+    controller = make_controller(max_limit=2, reserved=0, max_queue=1, max_wait=1)
+    for _ in range(2):
+        await controller.acquire(None)
+
+    queued = asyncio.create_task(controller.acquire(None))
+    await asyncio.sleep(0)
+    assert await controller.acquire(None) is False
+
+    controller.release(None)
+    assert await queued is True
+    assert controller.in_flight == 2
+
+
+async def test_route_limit_is_independent_of_global_limit():
+    controller = make_controller(route_limits={"/api/v1/users": 1})
+    route = controller.route_key("/api/v1/users/users")
+
+    assert await controller.acquire(route) is True
+    assert await controller.acquire(route) is False
+    assert await controller.acquire(None) is True
+
+
+async def test_waiter_blocked_by_its_route_limit_does_not_hold_up_other_routes():
+    controller = make_controller(max_limit=10, route_limits={"/slow": 1}, max_wait=1)
+    assert await controller.acquire("/slow") is True
+
+    queued = asyncio.create_task(controller.acquire("/slow"))
+    await asyncio.sleep(0)
+    assert await controller.acquire(None) is True
+    assert controller.in_flight == 2
+
+    controller.release("/slow")
+    assert await queued is True
+
+
+async def test_limit_adapts_to_pool_wait():
+    controller = make_controller(max_limit=10, min_limit=2)
+
+    for _ in range(5):
+        controller.adjust(pool_wait=0.5, loop_lag=0.0)
+    assert controller.limit < 10
+
+    for _ in range(50):
+        controller.adjust(pool_wait=0.0, loop_lag=0.0)
+    assert controller.limit == 10
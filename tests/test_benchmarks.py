@@ -0,0 +1,22 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+
+def test_api_benchmark_smoke():
+    """The in-process benchmark runs end to end against its SQLite stand-in"""
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.api_latency", "--iterations", "10",
+         "--scenario", "auth_me", "--scenario", "list_users_10", "--scenario", "send_email", "--json"],
+        capture_output=True, text=True, timeout=120, env={**os.environ},
+    )
+
+    assert proc.returncode == 0, proc.stderr
+    results = json.loads(proc.stdout)
+    assert set(results) == {"auth_me", "list_users_10", "send_email"}
+    assert all(r["failures"] == 0 for r in results.values())
@@ -0,0 +1,18 @@
+import os
+
+from app.utils.startup_profile import measure_first_request
+
+# Generous default so slow CI runners pass; tighten per environment
+COLD_START_BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", "3000"))
+
+
+def test_cold_start_stays_within_budget():
+    """
+    Importing the app must not pull in heavy optional dependencies, and a fresh
+    interpreter must serve its first request within the cold-start budget.
+    """
+    result = measure_first_request()
+
+    assert result["status_code"] == 200
+    assert result["eager_heavy_modules"] == []
+    assert result["time_to_first_request_ms"] <= COLD_START_BUDGET_MS, result
@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.core.context import DEADLINE_HEADER, time_left
+from app.db.session import statement_timeout_sql
+from app.services.deadline import RequestDeadlineMiddleware, resolve_timeout
+
+
+def test_resolve_timeout_uses_route_defaults_and_capped_client_header(monkeypatch):
+    monkeypatch.setattr(settings, "REQUEST_DEADLINE_SECONDS", 10.0)
+    monkeypatch.setattr(settings, "REQUEST_DEADLINE_MAX_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "REQUEST_DEADLINE_ROUTES", {
+        "/api/v1/items": 60.0, "/api/v1/items/ingest": 600.0, "/api/v1/items/export": 0,
+    })
+
+    assert resolve_timeout("/api/v1/users/users", None) == 10.0
+    assert resolve_timeout("/api/v1/items/search", None) == 60.0
+    assert resolve_timeout("/api/v1/items/export", None) is None
+    assert resolve_timeout("/api/v1/users/users", "250") == 0.25
+    assert resolve_timeout("/api/v1/users/users", "600000") == 30.0
+    assert resolve_timeout("/api/v1/users/users", "soon") == 10.0
+    # Asking for more time never shortens a route's own longer default
+    assert resolve_timeout("/api/v1/items/ingest", None) == 600.0
+    assert resolve_timeout("/api/v1/items/ingest", "1200000") == 600.0
+    assert resolve_timeout("/api/v1/items/ingest", "300000") == 300.0
+    assert resolve_timeout("/api/v1/items/export", "1200000") == 1200.0
+
+
+def test_statement_timeout_follows_remaining_time():
+    assert statement_timeout_sql(None) is None
+    assert statement_timeout_sql(1.2345) == "SET LOCAL statement_timeout = 1235"
+    assert statement_timeout_sql(-1) == "SET LOCAL statement_timeout = 1"
+
+
+def deadline_app() -> tuple[FastAPI, dict]:
+    app = FastAPI()
+    seen: dict = {}
+
+    @app.get("/slow")
+    async def slow():
+        seen["time_left"] = time_left()
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            seen["cancelled"] = True
+            raise
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            yield b"a"
+            await asyncio.sleep(0.2)
+            yield b"b"
+        return StreamingResponse(body())
+
+    # An @app.middleware layer inside, as in app.main: cancellation must reach through it
+    @app.middleware("http")
+    async def passthrough(request: Request, call_next):
+        return await call_next(request)
+
+    app.add_middleware(RequestDeadlineMiddleware)
+    return app, seen
+
+
+async def test_deadline_cancels_the_endpoint_and_returns_504():
+    app, seen = deadline_app()
+
+    started = time.perf_counter()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/slow", headers={DEADLINE_HEADER: "300"})
+
+    assert response.status_code == 504
+    assert time.perf_counter() - started < 1
+    assert seen["cancelled"] is True
+    assert 0 < seen["time_left"] <= 0.3
+
+
+async def test_deadline_does_not_cut_off_a_started_stream():
+    app, _ = deadline_app()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/stream", headers={DEADLINE_HEADER: "50"})
+
+    assert response.status_code == 200
+    assert response.content == b"ab"
@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel
+
+from app.services import idempotency
+
+pytestmark = pytest.mark.asyncio
+
+
+class Payload(BaseModel):
+    name: str
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = idempotency.MemoryIdempotencyStore(maxsize=100, ttl=60)
+    monkeypatch.setattr(idempotency, "get_idempotency_store", lambda: store)
+    return store
+
+
+@pytest.fixture
+async def app_client(store):
+    calls = {"count": 0}
+    router = APIRouter(route_class=idempotency.IdempotentRoute)
+
+    @router.post("/things", status_code=201)
+    async def create_thing(payload: Payload):
+        calls["count"] += 1
+        await asyncio.sleep(0.05)
+        return {"name": payload.name, "n": calls["count"]}
+
+    test_app = FastAPI()
+    test_app.include_router(router)
+    async with AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test") as ac:
+        yield ac, calls
+
+
+async def test_duplicate_replays_stored_response(app_client):
+    client, calls = app_client
+    headers = {"Idempotency-Key": "abc"}
+
+    first = await client.post("/things", json={"name": "a"}, headers=headers)
+    second = await client.post("/things", json={"name": "a"}, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert first.json() == second.json()
+    assert second.headers[idempotency.REPLAYED_HEADER] == "true"
+    assert calls["count"] == 1
+
+
+async def test_concurrent_duplicates_wait_for_first(app_client):
+    client, calls = app_client
+    headers = {"Idempotency-Key": "concurrent"}
+
+    responses = await asyncio.gather(
+        *(client.post("/things", json={"name": "a"}, headers=headers) for _ in range(5))
+    )
+
+    assert {r.status_code for r in responses} == {201}
+    assert len({r.text for r in responses}) == 1
+    assert calls["count"] == 1
+
+
+async def test_key_reused_with_different_body_is_rejected(app_client):
+    client, calls = app_client
+    headers = {"Idempotency-Key": "reused"}
+
+    await client.post("/things", json={"name": "a"}, headers=headers)
+    response = await client.post("/things", json={"name": "b"}, headers=headers)
+
+    assert response.status_code == 422
+    assert calls["count"] == 1
+
+
+async def test_requests_without_key_always_execute(app_client):
+    client, calls = app_client
+
+    await client.post("/things", json={"name": "a"})
+    await client.post("/things", json={"name": "a"})
+
+    assert calls["count"] == 2
@@ -0,0 +1,84 @@
+import pytest
+
+from app.core.config import settings
+from app.crud.item import prefix_upper_bound
+from app.services.item_ingest import iter_lines, parse_csv
+
+ITEMS_URL = "/api/v1/items"
+
+
+@pytest.fixture
+def client(sqlite_client, monkeypatch):
+    monkeypatch.setattr(settings, "ITEMS_INGEST_BATCH_SIZE", 2)
+    return sqlite_client
+
+
+async def chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def test_csv_parser_handles_chunk_boundaries_and_multiline_fields():
+    body = 'name,description\r\nbolt,"M3, zinc"\r\nnut,"two\nlines with ""quotes"""\r\nwasher,\r\n'.encode()
+    rows = [row async for row in parse_csv(iter_lines(chunks(body, 3), max_line_bytes=1024))]
+    assert rows == [("bolt", "M3, zinc"), ("nut", 'two\nlines with "quotes"'), ("washer", None)]
+
+
+async def test_ndjson_ingest_then_keyset_pages(client):
+    body = "\n".join(f'{{"name": "item-{i:02d}", "description": "d{i}"}}' for i in range(5)) + "\n"
+
+    response = await client.post(f"{ITEMS_URL}/ingest", content=chunks(body.encode(), 7),
+                                 headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 201
+    assert response.json()["inserted"] == 5 and response.json()["batches"] == 3
+
+    first = (await client.get(ITEMS_URL, params={"limit": 3})).json()
+    second = (await client.get(ITEMS_URL, params={"limit": 3, "after": first["next_cursor"]})).json()
+    assert [i["name"] for i in first["items"] + second["items"]] == [f"item-{i:02d}" for i in range(5)]
+    assert second["next_cursor"] is None
+
+
+async def test_bad_row_rolls_back_whole_load(client):
+    body = b'{"name": "ok"}\n{"name": "ok too"}\n{"name": "fine"}\n{"description": "no name"}\n'
+
+    response = await client.post(f"{ITEMS_URL}/ingest", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["line"] == 4
+    assert (await client.get(ITEMS_URL)).json()["items"] == []
+
+
+async def test_unsupported_content_type(client):
+    response = await client.post(f"{ITEMS_URL}/ingest", content=b"name\nx\n", headers={"Content-Type": "text/plain"})
+    assert response.status_code == 415
+
+
+async def test_name_prefix_search(client):
+    body = b"name\nwidget\nwidget%\nwidgets\nwidget_b\nwidgeu\ngadget\nwidget\n"
+    await client.post(f"{ITEMS_URL}/ingest", content=body, headers={"Content-Type": "text/csv"})
+
+    first = (await client.get(f"{ITEMS_URL}/search", params={"prefix": "widget", "limit": 3})).json()
+    second = (await client.get(f"{ITEMS_URL}/search",
+                               params={"prefix": "widget", "limit": 3, "after": first["next_cursor"]})).json()
+    names = [i["name"] for i in first["items"] + second["items"]]
+    assert names == ["widget", "widget", "widget%", "widget_b", "widgets"]
+
+    literal = (await client.get(f"{ITEMS_URL}/search", params={"prefix": "widget%"})).json()
+    assert [i["name"] for i in literal["items"]] == ["widget%"]
+
+
+async def test_name_prefix_search_with_trailing_punctuation(client):
+    # Collations that ignore punctuation would sort "a-z" and "a- b" outside ["a-", "a.")
+    body = b"name\na-z\nab\na- b\na-\naz\na.\n"
+    await client.post(f"{ITEMS_URL}/ingest", content=body, headers={"Content-Type": "text/csv"})
+
+    dash = (await client.get(f"{ITEMS_URL}/search", params={"prefix": "a-"})).json()
+    assert [i["name"] for i in dash["items"]] == ["a-", "a- b", "a-z"]
+    space = (await client.get(f"{ITEMS_URL}/search", params={"prefix": "a- "})).json()
+    assert [i["name"] for i in space["items"]] == ["a- b"]
+
+
+def test_prefix_upper_bound():
+    assert prefix_upper_bound("abc") == "abd"
+    assert prefix_upper_bound("a\U0010FFFF") == "b"
+    assert prefix_upper_bound("\U0010FFFF") is None
@@ -0,0 +1,125 @@
+import io
+import json
+import time
+
+from httpx import ASGITransport, AsyncClient
+from loguru import logger
+
+from app.core.context import REQUEST_ID_HEADER, new_request_id, request_id_var
+from app.core.logger import BufferedSink, LogSampler, log_exception
+from app.core.exceptions import AppException
+from app.main import app
+
+
+def capture(sink: BufferedSink, sampler=None):
+    handler_id = logger.add(sink, format="{message}", filter=sampler, level="DEBUG")
+    return handler_id
+
+
+def test_json_sink_includes_request_id_and_extras():
+    stream = io.StringIO()
+    sink = BufferedSink(stream, max_size=100, serialize=True)
+    handler_id = capture(sink)
+    token = request_id_var.set("req-1")
+    try:
+        logger.bind(route="/things/{id}").info("hello {}", "world")
+    finally:
+        request_id_var.reset(token)
+        logger.remove(handler_id)
+    sink.close()
+
+    entry = json.loads(stream.getvalue().splitlines()[0])
+    assert entry["message"] == "hello world"
+    assert entry["request_id"] == "req-1"
+    assert entry["route"] == "/things/{id}"
+    assert entry["level"] == "INFO"
+
+
+def test_full_buffer_drops_instead_of_blocking():
+    class SlowStream(io.StringIO):
+        def write(self, s):
+            time.sleep(0.05)
+            return super().write(s)
+
+    sink = BufferedSink(SlowStream(), max_size=2, serialize=False)
+    handler_id = capture(sink)
+    try:
+        started = time.perf_counter()
+        for i in range(50):
+            logger.info("line {}", i)
+        assert time.perf_counter() - started < 0.5
+    finally:
+        logger.remove(handler_id)
+    sink.close()
+
+    assert sink.dropped > 0
+    assert "dropped" in sink.stream.getvalue()
+
+
+def test_sampler_applies_route_rate_before_level_rate():
+    stream = io.StringIO()
+    sink = BufferedSink(stream, max_size=1000, serialize=False)
+    sampler = LogSampler({"info": 0.0}, {"/api/v1/auth/login": 1.0})
+    handler_id = capture(sink, sampler)
+    try:
+        for _ in range(10):
+            logger.info("dropped by level")
+            logger.bind(route="/api/v1/auth/login").info("kept by route")
+        logger.warning("kept, level not listed")
+    finally:
+        logger.remove(handler_id)
+    sink.close()
+
+    lines = stream.getvalue().splitlines()
+    assert lines.count("kept by route") == 10
+    assert "kept, level not listed" in lines
+    assert sampler.sampled_out == 10
+
+
+def test_client_errors_are_logged_without_traceback():
+    stream = io.StringIO()
+    sink = BufferedSink(stream, max_size=100, serialize=True)
+    handler_id = capture(sink)
+    try:
+        try:
+            raise AppException(status_code=401, detail="Invalid credentials")
+        except AppException as e:
+            log_exception(e)
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError as e:
+            log_exception(e)
+    finally:
+        logger.remove(handler_id)
+    sink.close()
+
+    client_error, server_error = (json.loads(line) for line in stream.getvalue().splitlines())
+    assert client_error["level"] == "INFO" and "exception" not in client_error
+    assert server_error["level"] == "ERROR" and server_error["exception"]["type"] == "RuntimeError"
+
+
+def test_new_request_id_rejects_malformed_input():
+    assert new_request_id("abc-123") == "abc-123"
+    assert new_request_id("bad id\nwith newline") != "bad id\nwith newline"
+    assert len(new_request_id(None)) == 32
+
+
+async def test_request_id_is_echoed():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        echoed = await client.get("/", headers={REQUEST_ID_HEADER: "trace-42"})
+        generated = await client.get("/")
+
+    assert echoed.headers[REQUEST_ID_HEADER] == "trace-42"
+    assert len(generated.headers[REQUEST_ID_HEADER]) == 32
+
+
+def test_request_id_travels_in_celery_headers():
+    from app.tasks.worker import _attach_request_id
+
+    headers: dict = {}
+    token = request_id_var.set("req-9")
+    try:
+        _attach_request_id(headers=headers)
+    finally:
+        request_id_var.reset(token)
+    assert headers["request_id"] == "req-9"
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.loop_monitor import LoopLagMonitor
+
+pytestmark = pytest.mark.asyncio
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+async def test_captures_stack_of_blocking_call():
+    monitor = LoopLagMonitor(interval=0.02, threshold=0.1, max_reports=5)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    assert monitor.blocked_count == 1
+    [report] = monitor.reports
+    assert any("blocking_call" in line for line in report["stack"])
+    assert report["blocked_ms"] >= 250
+    assert monitor.stats()["last_block"]["site"]
+
+
+async def test_healthy_loop_records_lag_without_reports():
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.2, max_reports=5)
+    monitor.start()
+    await asyncio.sleep(0.1)
+    await monitor.stop()
+
+    assert monitor.samples > 0
+    assert monitor.blocked_count == 0
+    metrics = monitor.prometheus()
+    assert f"event_loop_lag_seconds_count {monitor.samples}" in metrics
+    assert "event_loop_blocked_total 0" in metrics
@@ -0,0 +1,15 @@
+from app.db.migrations import VERSIONS_DIR, script_heads
+
+
+def test_script_heads_of_repository():
+    heads = script_heads(VERSIONS_DIR)
+
+    assert len(heads) == 1
+
+
+def test_script_heads_follows_down_revisions(tmp_path):
+    (tmp_path / "a.py").write_text("revision = 'a'\ndown_revision = None\n")
+    (tmp_path / "b.py").write_text("revision: str = 'b'\ndown_revision: str = 'a'\n")
+    (tmp_path / "c.py").write_text("revision = 'c'\ndown_revision = ('a', 'b')\n")
+
+    assert script_heads(tmp_path) == {"c"}
@@ -0,0 +1,74 @@
+import pytest
+from passlib.context import CryptContext
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.models.user import User
+from app.services import security
+from app.utils import hash_calibration
+
+
+def fake_bcrypt_timing(hasher, samples: int) -> float:
+    # 4 ms at the probe cost, doubling with each round
+    return 0.004 * 2 ** (hasher.default_rounds - hash_calibration.BCRYPT_PROBE_ROUNDS)
+
+
+def test_bcrypt_calibration_picks_the_highest_cost_within_target():
+    result = hash_calibration.calibrate_bcrypt(250, measure=fake_bcrypt_timing)
+
+    assert result["settings"]["BCRYPT_ROUNDS"] == 13
+    assert result["verify_ms"] == 128.0
+
+
+def test_bcrypt_calibration_never_goes_below_the_floor():
+    result = hash_calibration.calibrate_bcrypt(1, measure=fake_bcrypt_timing)
+
+    assert result["settings"]["BCRYPT_ROUNDS"] == hash_calibration.BCRYPT_MIN_ROUNDS
+
+
+def test_update_env_file_replaces_and_appends(tmp_path):
+    env = tmp_path / ".env"
+    env.write_text("SECRET_KEY=abc\nBCRYPT_ROUNDS=12\n")
+
+    hash_calibration.update_env_file(env, {"BCRYPT_ROUNDS": 11, "PASSWORD_HASH_SCHEME": "bcrypt"})
+
+    assert env.read_text() == "SECRET_KEY=abc\nBCRYPT_ROUNDS=11\nPASSWORD_HASH_SCHEME=bcrypt\n"
+
+
+@pytest.fixture
+def bcrypt_rounds(monkeypatch):
+    """Cheap hashing for tests; the context is rebuilt from settings"""
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    security.get_pwd_context.cache_clear()
+    yield
+    security.get_pwd_context.cache_clear()
+
+
+async def test_login_upgrades_outdated_hash_in_background(bcrypt_rounds, sqlite_client, sqlite_sessionmaker):
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret123")
+    assert security.needs_rehash(old_hash)
+    async with sqlite_sessionmaker() as session:
+        await session.execute(insert(User), [{"email": "ann@example.com", "username": "ann", "hashed_password": old_hash}])
+        await session.commit()
+
+    response = await sqlite_client.post("/api/v1/auth/login", json={"email": "ann@example.com", "password": "secret123"})
+    assert response.status_code == 200
+
+    async with sqlite_sessionmaker() as session:
+        new_hash = await session.scalar(select(User.hashed_password))
+    assert new_hash.startswith("$2b$05$")
+    assert security.verify_password("secret123", new_hash)
+    assert not security.needs_rehash(new_hash)
+
+
+async def test_rehash_does_not_overwrite_a_concurrent_password_change(bcrypt_rounds, sqlite_sessionmaker):
+    from app.crud import user as user_crud
+
+    async with sqlite_sessionmaker() as session:
+        await session.execute(insert(User), [{"email": "ann@example.com", "username": "ann", "hashed_password": "changed"}])
+        await session.commit()
+
+        replaced = await user_crud.user.replace_password_hash(session, user_id=1, old_hash="stale", new_hash="rehash")
+
+        assert replaced is False
+        assert await session.scalar(select(User.hashed_password)) == "changed"
@@ -0,0 +1,109 @@
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.services import profiling
+from app.services.profiling import RequestProfiler
+
+
+def busy_endpoint_work():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+
+
+def make_app(tmp_path, monkeypatch, **options) -> FastAPI:
+    settings = dict(token="s3cret", interval=0.001, sample_routes={}, directory=str(tmp_path), max_files=3)
+    settings.update(options)
+    monkeypatch.setattr(profiling, "profiler", RequestProfiler(**settings))
+
+    app = FastAPI()
+    app.middleware("http")(profiling.profile_requests)
+
+    @app.get("/slow/{item_id}")
+    async def slow(item_id: int):
+        busy_endpoint_work()
+        return {"id": item_id}
+
+    return app
+
+
+async def request(app: FastAPI, path: str, **kwargs) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get(path, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_admin_token_returns_speedscope_profile(tmp_path, monkeypatch):
+    app = make_app(tmp_path, monkeypatch)
+
+    response = await request(app, "/slow/1", headers={"X-Profile": "s3cret"})
+
+    assert response.headers["X-Profiled-Status"] == "200"
+    profile = response.json()
+    frames = [frame["name"] for frame in profile["shared"]["frames"]]
+    assert "busy_endpoint_work" in frames
+    assert profile["profiles"][0]["type"] == "sampled"
+
+
+def test_frame_key_falls_back_to_co_name_before_python_311():
+    code = SimpleNamespace(co_name="work", co_filename="app/x.py")  # 3.10 code objects have no co_qualname
+    frame = SimpleNamespace(f_code=code, f_lineno=7)
+
+    assert profiling.frame_key(frame) == ("work", "app/x.py", 7)
+
+
+@pytest.mark.asyncio
+async def test_wrong_token_is_ignored(tmp_path, monkeypatch):
+    app = make_app(tmp_path, monkeypatch)
+
+    response = await request(app, "/slow/1", params={"profile": "guess"})
+
+    assert response.json() == {"id": 1}
+    assert "X-Profiled-Status" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_token_in_query_string_is_ignored(tmp_path, monkeypatch):
+    app = make_app(tmp_path, monkeypatch)
+
+    response = await request(app, "/slow/1", params={"profile": "s3cret"})
+
+    assert response.json() == {"id": 1}
+    assert "X-Profiled-Status" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_query_string_selects_format(tmp_path, monkeypatch):
+    app = make_app(tmp_path, monkeypatch)
+
+    response = await request(app, "/slow/1", params={"profile": "pstats"}, headers={"X-Profile": "s3cret"})
+
+    assert "busy_endpoint_work" in response.text
+
+
+@pytest.mark.asyncio
+async def test_cprofile_format(tmp_path, monkeypatch):
+    app = make_app(tmp_path, monkeypatch)
+
+    response = await request(app, "/slow/1", headers={"X-Profile": "s3cret", "X-Profile-Format": "pstats"})
+
+    assert "busy_endpoint_work" in response.text
+
+
+@pytest.mark.asyncio
+async def test_sampled_route_profiles_every_nth_into_rolling_buffer(tmp_path, monkeypatch):
+    app = make_app(tmp_path, monkeypatch, sample_routes={"/slow/{item_id}": 2})
+
+    for i in range(10):
+        response = await request(app, f"/slow/{i}")
+        assert response.json() == {"id": i}
+
+    files = sorted(tmp_path.iterdir())
+    assert len(files) == 3  # 5 sampled, only max_files kept
+    assert all(f.name.endswith("-GET-slow_item_id.speedscope.json") for f in files)
+    json.loads(files[-1].read_text())
@@ -0,0 +1,52 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core.exceptions import TooManyRequestsException
+from app.services import rate_limit
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_token_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    backend = rate_limit.MemoryRateLimitBackend(maxsize=10, clock=clock)
+    rate = rate_limit.Rate.parse("3/minute")
+
+    assert [await backend.acquire("k", rate) for _ in range(3)] == [0, 0, 0]
+    assert await backend.acquire("k", rate) == pytest.approx(20.0)
+
+    clock.now += 20
+    assert await backend.acquire("k", rate) == 0
+
+
+async def test_limiter_raises_429_with_retry_after():
+    limiter = rate_limit.RateLimiter(
+        rate_limit.MemoryRateLimitBackend(maxsize=10), {"login:account": "1/hour"}
+    )
+
+    await limiter.hit("login:account", "a@example.com")
+    await limiter.hit("login:account", "b@example.com")
+    with pytest.raises(TooManyRequestsException) as exc_info:
+        await limiter.hit("login:account", "a@example.com")
+
+    assert exc_info.value.status_code == 429
+    assert int(exc_info.value.headers["Retry-After"]) > 3500
+
+
+async def test_login_is_rate_limited_per_ip(sqlite_client: AsyncClient, monkeypatch):
+    limiter = rate_limit.RateLimiter(rate_limit.MemoryRateLimitBackend(maxsize=10), {"login:ip": "1/hour"})
+    await limiter.hit("login:ip", "127.0.0.1")
+    monkeypatch.setattr(rate_limit, "_limiter", limiter)
+
+    response = await sqlite_client.post("/api/v1/auth/login", json={"email": "a@example.com", "password": "secret"})
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
@@ -0,0 +1,11 @@
+from app.server import auto_workers
+
+
+def test_auto_workers_follows_cpus():
+    assert auto_workers(cpus=4, db_max_connections=100, pool_size=5, max_overflow=10) == 4
+
+
+def test_auto_workers_respects_db_connection_budget():
+    # 8 CPUs, but only 45 connections / 15 per worker
+    assert auto_workers(cpus=8, db_max_connections=45, pool_size=5, max_overflow=10) == 3
+    assert auto_workers(cpus=8, db_max_connections=5, pool_size=5, max_overflow=10) == 1
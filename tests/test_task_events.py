@@ -0,0 +1,73 @@
+import asyncio
+import json
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.services import task_events, task_status
+
+pytestmark = pytest.mark.asyncio
+
+
+class OfflineHub(task_events.TaskEventHub):
+    """Hub without the Redis reader; tests feed events through dispatch()"""
+
+    def _ensure_reader(self) -> None:
+        pass
+
+
+async def test_stream_emits_transitions_until_terminal(monkeypatch):
+    states = {"t1": "PENDING"}
+
+    async def fake_statuses(task_ids):
+        return {t: task_status.parse_task_meta(t, json.dumps({"status": states[t]})) for t in task_ids}
+
+    monkeypatch.setattr(task_status, "get_task_statuses", fake_statuses)
+    async def fake_status(task_id):
+        return (await fake_statuses([task_id]))[task_id]
+
+    monkeypatch.setattr(task_status, "get_task_status", fake_status)
+
+    hub = OfflineHub("task-events", queue_size=10)
+    stream = task_events.stream_task_events(["t1"], hub=hub)
+
+    first = await stream.__anext__()
+    assert '"PENDING"' in first
+
+    hub.dispatch(json.dumps({"task_id": "t1", "status": "STARTED"}))
+    assert '"STARTED"' in await stream.__anext__()
+
+    states["t1"] = "SUCCESS"
+    hub.dispatch(json.dumps({"task_id": "t1", "status": "SUCCESS"}))
+    assert '"SUCCESS"' in await stream.__anext__()
+    assert (await stream.__anext__()).startswith("event: end")
+
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+    assert not hub._listeners
+
+
+async def test_stream_ends_with_error_event_when_backend_fails(monkeypatch):
+    async def failing_statuses(task_ids):
+        raise RedisConnectionError("Connection refused")
+
+    monkeypatch.setattr(task_status, "get_task_statuses", failing_statuses)
+    hub = OfflineHub("task-events", queue_size=10)
+
+    chunks = [chunk async for chunk in task_events.stream_task_events(["t1"], hub=hub)]
+
+    assert len(chunks) == 1 and chunks[0].startswith("event: error")
+    assert json.loads(chunks[0].split("data: ")[1]) == {"detail": "Task status unavailable", "pending": ["t1"]}
+    assert not hub._listeners
+
+
+async def test_dispatch_ignores_unwatched_and_malformed_events():
+    hub = OfflineHub("task-events", queue_size=1)
+    queue = hub.subscribe(["t1"])
+
+    hub.dispatch("not json")
+    hub.dispatch(json.dumps({"task_id": "other", "status": "SUCCESS"}))
+    hub.dispatch(json.dumps({"task_id": "t1", "status": "STARTED"}))
+    hub.dispatch(json.dumps({"task_id": "t1", "status": "SUCCESS"}))  # queue full, dropped
+
+    assert queue.qsize() == 1
+    assert (await asyncio.wait_for(queue.get(), 1))["status"] == "STARTED"
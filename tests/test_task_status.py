@@ -0,0 +1,53 @@
+import json
+import pytest
+
+from app.services import task_status
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeRedis:
+    def __init__(self, data: dict[str, str]):
+        self.data = data
+        self.mget_calls: list[list[str]] = []
+
+    async def mget(self, keys):
+        self.mget_calls.append(list(keys))
+        return [self.data.get(key) for key in keys]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = FakeRedis({
+        task_status.RESULT_KEY_PREFIX + "done": json.dumps(
+            {"status": "SUCCESS", "result": {"status": "sent"}, "date_done": "2025-01-01T00:00:00"}
+        ),
+        task_status.RESULT_KEY_PREFIX + "failed": json.dumps(
+            {"status": "FAILURE", "result": {"exc_type": "ValueError", "exc_message": ["boom"]}}
+        ),
+        task_status.RESULT_KEY_PREFIX + "running": json.dumps({"status": "STARTED", "result": None}),
+    })
+    monkeypatch.setattr(task_status, "get_redis", lambda: redis)
+    task_status.terminal_cache.clear()
+    yield redis
+    task_status.terminal_cache.clear()
+
+
+async def test_batch_lookup_uses_single_mget(fake_redis):
+    statuses = await task_status.get_task_statuses(["done", "failed", "running", "unknown", "done"])
+
+    assert len(fake_redis.mget_calls) == 1
+    assert len(fake_redis.mget_calls[0]) == 4
+    assert statuses["done"]["status"] == "SUCCESS"
+    assert statuses["done"]["result"] == {"status": "sent"}
+    assert statuses["failed"]["error"].startswith("ValueError")
+    assert statuses["running"]["status"] == "STARTED"
+    assert statuses["unknown"]["status"] == "PENDING"
+
+
+async def test_terminal_states_are_cached(fake_redis):
+    await task_status.get_task_statuses(["done", "running"])
+    await task_status.get_task_statuses(["done", "running"])
+
+    # Second poll only asks Redis about the task that can still change
+    assert fake_redis.mget_calls[1] == [task_status.RESULT_KEY_PREFIX + "running"]
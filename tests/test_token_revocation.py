@@ -0,0 +1,164 @@
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import insert
+
+from app.models.user import User
+from app.services import token_revocation
+from app.services.security import hash_password
+
+AUTH_URL = "/api/v1/auth"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingStore(token_revocation.MemoryRevocationStore):
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+
+        self.fetched: list[list[str]] = []
+
+    async def contains(self, family: str) -> bool:
+        self.lookups += 1
+        return await super().contains(family)
+
+    async def changes(self, cursor):
+        families, cursor = await super().changes(cursor)
+        self.fetched.append(families)
+        return families, cursor
+
+
+class UnavailableStore(token_revocation.MemoryRevocationStore):
+    async def contains(self, family: str) -> bool:
+        raise RedisConnectionError("Connection refused")
+
+    async def revoke(self, family: str, expires_at: float) -> None:
+        raise RedisConnectionError("Connection refused")
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = token_revocation.BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"in-{i}")
+
+    assert all(f"in-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"out-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+async def test_unrevoked_ids_are_answered_by_the_filter_alone():
+    store = CountingStore()
+    revocations = token_revocation.TokenRevocations(store, sync_interval=5, capacity=100, error_rate=0.001)
+    await revocations.revoke("fam-1", expires_at=2e9)
+
+    assert [await revocations.is_revoked(f"fam-{i}") for i in range(2, 50)] == [False] * 48
+    assert store.lookups == 0
+    assert await revocations.is_revoked("fam-1") is True
+    assert store.lookups == 1
+
+
+async def test_revocations_from_other_workers_arrive_with_the_next_sync():
+    clock, store = FakeClock(), token_revocation.MemoryRevocationStore()
+    worker_a = token_revocation.TokenRevocations(store, sync_interval=5, capacity=100, error_rate=0.001, clock=clock)
+    worker_b = token_revocation.TokenRevocations(store, sync_interval=5, capacity=100, error_rate=0.001, clock=clock)
+    assert await worker_b.is_revoked("fam-1") is False
+
+    await worker_a.revoke("fam-1", expires_at=2e9)
+    assert await worker_b.is_revoked("fam-1") is False
+
+    clock.now += 5
+    await worker_b.is_revoked("fam-1")  # schedules the background sync
+    await worker_b._sync_task
+    assert await worker_b.is_revoked("fam-1") is True
+
+
+async def test_sync_fetches_only_new_revocations():
+    clock, store = FakeClock(), CountingStore()
+    revocations = token_revocation.TokenRevocations(store, sync_interval=5, capacity=100, error_rate=0.001, clock=clock)
+    await store.revoke("fam-1", expires_at=2e9)
+    await revocations.sync()
+    await store.revoke("fam-2", expires_at=2e9)
+    await revocations.sync()
+
+    assert store.fetched == [["fam-1"], ["fam-2"]]
+    assert "fam-1" in revocations.filter and "fam-2" in revocations.filter
+
+
+async def test_refresh_token_claims_are_single_use_and_stay_out_of_the_filter():
+    revocations = token_revocation.TokenRevocations(
+        token_revocation.MemoryRevocationStore(), sync_interval=5, capacity=100, error_rate=0.001,
+    )
+
+    assert await revocations.claim("jti-1", expires_at=2e9) is True
+    assert await revocations.claim("jti-1", expires_at=2e9) is False
+    assert revocations.filter.count == 0
+
+
+@pytest.fixture
+async def tokens(sqlite_client, sqlite_sessionmaker, monkeypatch):
+    monkeypatch.setattr(token_revocation, "_revocations", token_revocation.TokenRevocations(
+        token_revocation.MemoryRevocationStore(), sync_interval=5, capacity=100, error_rate=0.001,
+    ))
+    async with sqlite_sessionmaker() as session:
+        await session.execute(insert(User), [{
+            "email": "ann@example.com", "username": "ann", "hashed_password": hash_password("secret123"),
+        }])
+        await session.commit()
+
+    response = await sqlite_client.post(f"{AUTH_URL}/login", json={"email": "ann@example.com", "password": "secret123"})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_refresh_rotates_and_reuse_revokes_the_session(sqlite_client, tokens):
+    rotated = await sqlite_client.post(f"{AUTH_URL}/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert rotated.status_code == 200
+    fresh = rotated.json()
+    assert fresh["refresh_token"] != tokens["refresh_token"]
+    me = await sqlite_client.get(f"{AUTH_URL}/me", headers={"Authorization": f"Bearer {fresh['access_token']}"})
+    assert me.status_code == 200
+
+    reused = await sqlite_client.post(f"{AUTH_URL}/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert reused.status_code == 401
+
+    # The leaked token's whole session is gone, including tokens rotated from it
+    again = await sqlite_client.post(f"{AUTH_URL}/refresh", json={"refresh_token": fresh["refresh_token"]})
+    assert again.status_code == 401
+    me = await sqlite_client.get(f"{AUTH_URL}/me", headers={"Authorization": f"Bearer {fresh['access_token']}"})
+    assert me.status_code == 401
+
+
+async def test_logout_revokes_access_and_refresh_tokens(sqlite_client, tokens):
+    response = await sqlite_client.post(f"{AUTH_URL}/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+
+    me = await sqlite_client.get(f"{AUTH_URL}/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert me.status_code == 401
+    refreshed = await sqlite_client.post(f"{AUTH_URL}/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert refreshed.status_code == 401
+
+
+async def test_unconfirmable_filter_hit_fails_closed(sqlite_client, tokens):
+    await token_revocation._revocations.sync()
+    response = await sqlite_client.post(f"{AUTH_URL}/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    token_revocation._revocations.store = UnavailableStore()
+
+    me = await sqlite_client.get(f"{AUTH_URL}/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert me.status_code == 503
+
+
+async def test_logout_without_the_store_is_unavailable(sqlite_client, tokens):
+    token_revocation._revocations.store = UnavailableStore()
+
+    response = await sqlite_client.post(f"{AUTH_URL}/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 503
+    # Misses never reach the store, so unrevoked sessions keep working
+    me = await sqlite_client.get(f"{AUTH_URL}/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert me.status_code == 200
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.tracing import InMemoryExporter, parse_traceparent, tracer
+from app.services import tracing
+
+
+@pytest.fixture
+def exporter(monkeypatch) -> InMemoryExporter:
+    exporter = InMemoryExporter(max_spans=100)
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    return exporter
+
+
+def test_head_sampling_decision_is_inherited(exporter, monkeypatch):
+    monkeypatch.setattr(tracer, "sample_rate", 0.0)
+    with tracer.span("root") as root:
+        with tracer.span("child") as child:
+            pass
+    assert not root.sampled and not child.sampled
+    assert child.trace_id == root.trace_id
+    assert list(exporter.spans) == []
+
+    # A sampled remote parent wins over the local rate
+    with tracer.span("remote child", traceparent=f"00-{'a' * 32}-{'b' * 16}-01") as span:
+        pass
+    assert span.sampled and span.parent_id == "b" * 16
+
+
+def test_parse_traceparent_rejects_garbage():
+    assert parse_traceparent("00-xyz-abc-01") is None
+    assert parse_traceparent(f"00-{'a' * 32}-{'b' * 16}-00") == ("a" * 32, "b" * 16, False)
+
+
+async def test_request_and_sql_spans_share_a_trace(exporter):
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    tracing.instrument_engine(engine)
+
+    app = FastAPI()
+    app.middleware("http")(tracing.trace_requests)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        async with engine.connect() as conn:
+            return {"value": (await conn.execute(text("SELECT :v"), {"v": item_id})).scalar()}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/items/3")
+    await engine.dispose()
+
+    sql, server = exporter.spans
+    assert server["name"] == "GET /items/{item_id}"
+    assert server["attributes"]["http.status_code"] == 200
+    assert sql["name"] == "SELECT" and sql["attributes"]["db.statement"] == "SELECT ?"
+    assert sql["trace_id"] == server["trace_id"] and sql["parent_id"] == server["span_id"]
+    assert parse_traceparent(response.headers["traceparent"])[0] == server["trace_id"]
+
+
+def test_celery_publish_and_execution_are_linked(exporter):
+    from app.tasks import worker
+
+    headers = {"id": "task-1"}
+    with tracer.span("POST /send-email") as request_span:
+        worker._start_publish_span(sender="app.tasks.email.send_email", headers=headers)
+        worker._end_publish_span()
+
+    task = SimpleNamespace(name="app.tasks.email.send_email", request=SimpleNamespace(traceparent=headers["traceparent"]))
+    worker._start_task_span(task_id="task-1", task=task)
+    worker._mark_task_span_failed(task_id="task-1", exception=RuntimeError("smtp down"))
+    worker._end_task_span(task_id="task-1", state="FAILURE")
+
+    publish, _, run = exporter.spans
+    assert publish["parent_id"] == request_span.span_id
+    assert run["parent_id"] == publish["span_id"]
+    assert run["trace_id"] == request_span.trace_id
+    assert run["status"] == "error" and run["attributes"]["celery.state"] == "FAILURE"
@@ -0,0 +1,62 @@
+import argparse
+import json
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.services.traffic_capture import TrafficRecorder
+from app.services import traffic_capture
+from benchmarks.traffic_replay import build_request, load_capture, parse_params, schedule
+
+
+async def test_capture_records_route_template(tmp_path, monkeypatch):
+    recorder = TrafficRecorder(str(tmp_path / "traffic.ndjson"), sample_rate=1.0, flush_every=1000)
+    monkeypatch.setattr(traffic_capture, "recorder", recorder)
+
+    app = FastAPI()
+    app.middleware("http")(traffic_capture.capture_traffic)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/items/42?limit=5&offset=0", headers={"Authorization": "Bearer secret"})
+    await recorder.flush()
+
+    [record] = load_capture(recorder.path)
+    assert record["m"] == "GET"
+    assert record["r"] == "/items/{item_id}"
+    assert record["q"] == ["limit", "offset"]
+    assert record["a"] == 1 and record["s"] == 200
+    # Only shapes are stored, never concrete values (numeric fields are timings and counts)
+    assert set(record) == {"t", "m", "r", "q", "b", "a", "s", "d"}
+    strings = json.dumps([record["m"], record["r"], record["q"]])
+    assert "42" not in strings and "5" not in strings and "secret" not in recorder.path.read_text()
+
+
+def test_malformed_content_length_is_recorded_as_zero(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path / "traffic.ndjson"), sample_rate=1.0, flush_every=1000)
+    request = Request({"type": "http", "method": "POST", "path": "/items", "query_string": b"",
+                       "headers": [(b"content-length", b"12abc")]})
+
+    recorder.record(request, 400, 0.001)
+
+    assert json.loads(recorder._buffer[0])["b"] == 0
+
+
+def test_replay_builds_concrete_requests():
+    args = argparse.Namespace(token="jwt", login_email="a@example.com", login_password="pw")
+    record = {"t": 0, "m": "GET", "r": "/api/v1/users/users/{user_id}", "q": ["limit"], "b": 0, "a": 1}
+
+    request = build_request(record, args, parse_params(["user_id=7-7"]))
+
+    assert request["url"] == "/api/v1/users/users/7"
+    assert request["params"] == {"limit": "50"}
+    assert request["headers"]["Authorization"] == "Bearer jwt"
+
+
+def test_replay_schedule_scales_gaps():
+    records = [{"t": 1000}, {"t": 2000}, {"t": 3000}]
+    assert [offset for offset, _ in schedule(records, rate=2.0, loops=2)] == [0.0, 0.5, 1.0, 1.0, 1.5, 2.0]
@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import insert, update
+
+from app.core.config import settings
+from app.crud import user as user_crud
+from app.models.user import User, UserTombstone
+
+CHANGES_URL = "/api/v1/users/users/changes"
+
+
+@pytest.fixture
+async def feed(sqlite_client, sqlite_sessionmaker, monkeypatch):
+    async with sqlite_sessionmaker() as session:
+        await session.execute(insert(User), [
+            {"id": i, "email": f"user{i}@example.com", "username": f"user{i}", "hashed_password": "x",
+             "updated_at": datetime(2024, 1, 1, 0, 0, i, tzinfo=timezone.utc)}
+            for i in (1, 2, 3)
+        ])
+        await session.commit()
+        await user_crud.user.remove(session, id=2)
+        # Pin the delete time too; SQLite's CURRENT_TIMESTAMP only has second resolution
+        await session.execute(update(UserTombstone).values(deleted_at=datetime(2024, 1, 1, 0, 0, 10, tzinfo=timezone.utc)))
+        await session.commit()
+
+    monkeypatch.setattr(settings, "USER_CHANGES_SETTLE_SECONDS", 0.0)
+    return sqlite_client, sqlite_sessionmaker
+
+
+async def test_feed_pages_through_upserts_and_tombstones(feed):
+    client, session_factory = feed
+
+    first = (await client.get(CHANGES_URL, params={"limit": 2})).json()
+    assert [(c["op"], c["id"]) for c in first["changes"]] == [("upsert", 1), ("upsert", 3)]
+    assert first["changes"][0]["user"]["email"] == "user1@example.com"
+    assert first["has_more"] is True
+
+    second = (await client.get(CHANGES_URL, params={"since": first["next_cursor"], "limit": 2})).json()
+    assert second["changes"] == [{"op": "delete", "id": 2}]
+    assert second["has_more"] is False
+
+    # Caught up: the cursor is stable until something changes
+    idle = (await client.get(CHANGES_URL, params={"since": second["next_cursor"]})).json()
+    assert idle == {"changes": [], "next_cursor": second["next_cursor"], "has_more": False}
+
+    async with session_factory() as session:
+        u = await user_crud.user.get_by_id(session, 1)
+        await user_crud.user.update(session, db_obj=u, obj_in={"username": "renamed"})
+
+    update = (await client.get(CHANGES_URL, params={"since": second["next_cursor"]})).json()
+    assert [(c["op"], c["id"], c["user"]["username"]) for c in update["changes"]] == [("upsert", 1, "renamed")]
+
+
+async def test_invalid_cursor_is_rejected(feed):
+    client, _ = feed
+    response = await client.get(CHANGES_URL, params={"since": "not-a-cursor"})
+    assert response.status_code == 400
+    # Well-formed, but past the largest datetime
+    response = await client.get(CHANGES_URL, params={"since": "fffffffffffffff.1"})
+    assert response.status_code == 400
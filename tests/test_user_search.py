@@ -0,0 +1,57 @@
+from sqlalchemy import insert
+
+from app.models.user import User
+
+SEARCH_URL = "/api/v1/users/users/search"
+
+USERS = [
+    ("ann@example.com", "ann"),
+    ("anna.smith@example.com", "annas"),
+    ("joanne@example.com", "joanne"),
+    ("bob@example.com", "bob_ann"),
+    ("carl@example.com", "carl"),
+    ("x%y@example.com", "percent"),
+]
+
+
+async def seed(sqlite_sessionmaker) -> None:
+    async with sqlite_sessionmaker() as session:
+        await session.execute(insert(User), [
+            {"email": email, "username": username, "hashed_password": "x"} for email, username in USERS
+        ])
+        await session.commit()
+
+
+async def test_results_are_ranked_exact_prefix_substring(sqlite_client, sqlite_sessionmaker):
+    await seed(sqlite_sessionmaker)
+
+    body = (await sqlite_client.get(SEARCH_URL, params={"q": "ANN"})).json()
+
+    assert [(hit["match"], hit["user"]["username"]) for hit in body["items"]] == [
+        ("exact", "ann"), ("prefix", "annas"), ("substring", "bob_ann"), ("substring", "joanne"),
+    ]
+    assert body["next_cursor"] is None
+
+
+async def test_keyset_pages_cover_all_results_once(sqlite_client, sqlite_sessionmaker):
+    await seed(sqlite_sessionmaker)
+
+    seen, after = [], None
+    while True:
+        params = {"q": "ann", "limit": 1} | ({"after": after} if after else {})
+        body = (await sqlite_client.get(SEARCH_URL, params=params)).json()
+        seen += [hit["user"]["username"] for hit in body["items"]]
+        after = body["next_cursor"]
+        if after is None:
+            break
+    assert seen == ["ann", "annas", "bob_ann", "joanne"]
+
+
+async def test_short_queries_match_prefixes_only_and_wildcards_are_literal(sqlite_client, sqlite_sessionmaker):
+    await seed(sqlite_sessionmaker)
+
+    short = (await sqlite_client.get(SEARCH_URL, params={"q": "an"})).json()
+    assert [hit["user"]["username"] for hit in short["items"]] == ["ann", "annas"]
+
+    literal = (await sqlite_client.get(SEARCH_URL, params={"q": "x%y"})).json()
+    assert [hit["user"]["username"] for hit in literal["items"]] == ["percent"]
@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.db.warmup import warm_up
+from app.models.base import Base
+
+pytest.importorskip("aiosqlite")
+
+
+async def test_warm_up_primes_distinct_pooled_connections(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'warm.db'}", poolclass=AsyncAdaptedQueuePool, pool_size=3)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    statements: list[str] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    report = await warm_up(engine, 3)
+
+    assert report["connections"] == 3
+    assert engine.pool.checkedin() == 3  # all returned to the pool, ready for requests
+    assert len(statements) == 9  # user by id, by email and the list page on each connection
+    assert sum("LIMIT" in statement for statement in statements) == 3
+    await engine.dispose()
+
+
+async def test_warm_up_returns_opened_connections_when_one_fails(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'warm.db'}", poolclass=AsyncAdaptedQueuePool, pool_size=3)
+    attempts = []
+
+    @event.listens_for(engine.sync_engine, "do_connect")
+    def fail_third(dialect, conn_rec, cargs, cparams):
+        attempts.append(1)
+        if len(attempts) == 3:
+            raise OSError("connection refused")
+
+    with pytest.raises(Exception, match="connection refused"):
+        await warm_up(engine, 3)
+
+    assert engine.pool.checkedout() == 0
+    assert engine.pool.checkedin() == 2
+    await engine.dispose()